@@ -0,0 +1,371 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+File name:  async_api.py
+Authors:    Erwin Meijerhof (S2377012)
+            Wessel Poelman  (S2976129)
+Date:       16-10-2026
+GitHub:     https://github.com/WPoelman/hci-final-project
+Description:
+    Asyncio based alternative to the tweepy based TweepyApi. It talks to the
+    v1.1 search and status endpoints with a pooled keep-alive HTTP client
+    running on its own event loop, so the hops of all chains in a search page
+    are in flight at the same time without needing a thread per chain. Both
+    apis share their state and public methods through BaseApi, see
+    base_api.py, so it can be given to a Feed as its api. The stand-in server
+    in fake_twitter.py can be used instead of the real api by passing its url
+    as the api_root.
+Usage:
+    api = AsyncTweepyApi(api_root=StandInServer(corpus).start().url)
+    conversation = api.get_conversation('covid-19', 'English')
+"""
+
+import asyncio
+import threading
+from functools import partial
+from urllib.parse import urlencode
+
+import aiohttp
+import tweepy
+from oauthlib.oauth1 import Client
+from yarl import URL
+
+from base_api import BaseApi
+from chain_resolver import BROKEN, DONE, ReplyGraph
+from general_status import GeneralStatus
+from scheduler import RequestScheduler
+from search_cursor import SEARCH_COUNT
+from tweet_record import TweetRecord
+
+
+class AsyncTweepyApi(BaseApi):
+    def __init__(self, credentials_path='../credentials.txt',
+                 cache_path='../status_cache.db',
+                 search_state_path='../search_state.json',
+                 api_root='https://api.twitter.com/1.1',
+                 max_in_flight=200):
+        super().__init__(cache_path, search_state_path)
+
+        # All requests wait for their turn here, see scheduler.py.
+        self.scheduler = RequestScheduler(on_wait=self.__on_rate_limit_wait,
+                                          halted=lambda: self.halt)
+
+        self.reply_graph = ReplyGraph()
+        self.api_root = api_root
+        self.max_in_flight = max_in_flight
+
+        # A Feed calls 'get_conversation' one call at a time with this api,
+        # the chains are walked concurrently within every call.
+        self.workers = 1
+
+        # Status lookups that are currently in flight by tweet id, so chains
+        # that share a parent only fetch it once.
+        self.in_flight = {}
+        self.requests = 0
+
+        # All requests run on a single event loop in its own thread, the
+        # session and semaphore get created on that loop once needed.
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = threading.Thread(target=self.loop.run_forever,
+                                            daemon=True)
+        self.loop_thread.start()
+        self.session = None
+        self.semaphore = None
+
+        self.credentials = self.read_in_credentials(credentials_path)
+
+        # This happens when someone does not have a valid credentials.txt file
+        # in their root directory of the program. Requests are sent unsigned
+        # then, which is fine for the stand-in server.
+        if self.credentials:
+            self.api = self.__create_api()
+
+    def __create_api(self):
+        ''' Creates an OAuth 1 client that signs the requests '''
+        return Client(
+            self.credentials['API_KEY'],
+            client_secret=self.credentials['API_SECRET'],
+            resource_owner_key=self.credentials['ACCESS_TOKEN'],
+            resource_owner_secret=self.credentials['ACCESS_SECRET']
+        )
+
+    def __on_rate_limit_wait(self, endpoint, delay):
+        ''' Lets the user know we are waiting for the rate limit '''
+        self.set_status(GeneralStatus.RETRYING)
+        self.set_message((
+            f'Rate limit of {endpoint} reached, '
+            f'waiting {delay:.0f} seconds...'
+        ))
+
+    def __clean(self, response):
+        ''' Turns a raw tweet into a TweetRecord '''
+        return TweetRecord.from_dict(response, self.keep_full_user)
+
+    async def __request(self, endpoint, path, params):
+        ''' Sends a signed GET request to the api and returns the parsed json.
+            Every request waits for the scheduler, requests that run into the
+            rate limit are tried again once the window resets. Returns None
+            when halted while waiting. Raises the same errors as tweepy does.
+        '''
+        if not self.session:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_in_flight,
+                                               keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=60)
+            )
+            self.semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        query = urlencode({k: v for k, v in params.items() if v is not None})
+
+        while True:
+            if not await self.scheduler.acquire_async(endpoint):
+                return None
+
+            url = f'{self.api_root}{path}?{query}'
+            headers = {}
+
+            # Every attempt needs a fresh signature.
+            if self.api:
+                url, headers, _ = self.api.sign(url)
+
+            self.requests += 1
+
+            async with self.semaphore:
+                async with self.session.get(URL(url, encoded=True),
+                                            headers=headers) as resp:
+                    try:
+                        body = await resp.json(content_type=None)
+                    except ValueError:
+                        body = None
+
+                    if resp.status == 200:
+                        self.scheduler.observe(endpoint, resp.headers)
+                        return body
+
+                    errors = []
+                    if isinstance(body, dict):
+                        errors = body.get('errors', [])
+
+                    code = errors[0]['code'] if errors else None
+                    reason = errors[0]['message'] if errors else resp.reason
+
+                    if resp.status in (420, 429) or code == 88:
+                        self.scheduler.rate_limited(endpoint, resp.headers)
+                        continue
+
+                    raise tweepy.error.TweepError(reason, resp, code)
+
+    async def __show(self, tweet_id):
+        ''' Fetches a single tweet, returns None if it does not exist (any
+            more), is not visible or when halted.
+        '''
+        try:
+            response = await self.__request('statuses/show',
+                                            '/statuses/show.json',
+                                            {'id': tweet_id})
+        except tweepy.error.TweepError as err:
+            # 144: No status found, 179: Not authorized to see the status,
+            # 63: User has been suspended
+            if err.api_code in (144, 179, 63):
+                self.reply_graph.mark_missing([tweet_id])
+                return None
+            raise
+
+        if not response:
+            self.reply_graph.mark_missing([tweet_id])
+            return None
+
+        tweet = self.__clean(response)
+        self.status_cache.put_many([tweet])
+        self.reply_graph.add_many([tweet])
+
+        return tweet
+
+    async def __fetch_status(self, tweet_id):
+        ''' Returns a tweet from the cache or fetches it. Concurrent requests
+            for the same tweet share the same lookup.
+        '''
+        cached = self.status_cache.get_many([tweet_id])
+        if cached:
+            self.reply_graph.add_many([cached[tweet_id]])
+            return cached[tweet_id]
+
+        task = self.in_flight.get(tweet_id)
+        if not task:
+            task = asyncio.ensure_future(self.__show(tweet_id))
+            self.in_flight[tweet_id] = task
+
+        try:
+            return await task
+        finally:
+            self.in_flight.pop(tweet_id, None)
+
+    async def __walk_chain(self, response):
+        ''' Walks up the reply chain of a single reply tweet. Uses the same
+            exit conditions as the ChainResolver: stop at the main 'parent'
+            or at the maximum number of turns. Parts of the chain that are
+            already in the reply graph are not fetched again.
+        '''
+        chain = [self.__clean(response)]
+
+        while len(chain) < self.max_conv_len:
+            if self.halt:
+                return []
+
+            state = self.reply_graph.extend(chain, self.max_conv_len)
+
+            if state == DONE:
+                break
+            if state == BROKEN:
+                return []
+
+            parent = await self.__fetch_status(chain[-1].parent_id)
+
+            if not parent:
+                return []
+            if not parent.parent_id:
+                break
+
+            chain.append(parent)
+
+        return chain
+
+    async def get_conversation_async(self, query=None, language=None,
+                                     geocode=None):
+        ''' Coroutine version of 'get_conversation', this one should be used
+            when already running on an event loop.
+        '''
+        self.set_status(GeneralStatus.FETCHING)
+
+        if not language:
+            language = self.default_language
+
+        if (query, language, geocode) != self.buffer_key:
+            self.clear_buffer()
+            self.buffer_key = (query, language, geocode)
+
+        try:
+            cursor = self.search_cursors.cursor(query, language, geocode)
+
+            while not self.conversation_buffer and not self.halt:
+                params = cursor.next_params()
+
+                if not params:
+                    break
+
+                page = await self.__request('search', '/search/tweets.json', {
+                    'q': query,
+                    'lang': self.available_languages[language],
+                    'geocode': geocode,
+                    'count': SEARCH_COUNT,
+                    **params,
+                })
+
+                if page is None:
+                    break
+
+                statuses = page['statuses']
+                position = cursor.advance([s['id'] for s in statuses])
+
+                # Candidates that were rejected before are skipped.
+                candidates = [
+                    s
+                    for s in statuses
+                    if s['in_reply_to_status_id'] and
+                    not self.rejections.is_rejected(s['id'],
+                                                    self.min_conv_len,
+                                                    self.max_conv_len)
+                ]
+                cleaned = [self.__clean(c) for c in candidates]
+                self.status_cache.put_many(cleaned)
+                self.reply_graph.add_many(cleaned)
+
+                self.set_status(GeneralStatus.PARSING)
+
+                # All hops of all chains in this page are in flight at once.
+                conversations = await asyncio.gather(
+                    *(self.__walk_chain(c) for c in candidates)
+                )
+
+                for candidate, conversation in zip(candidates, conversations):
+                    # Halted conversations are empty, but they are not broken.
+                    if self.halt:
+                        break
+
+                    self.accept_conversation(candidate['id'], conversation)
+
+                self.rejections.flush()
+
+                # The position is not saved for a page that was halted
+                # halfway, or before its conversations are handed out.
+                if self.halt:
+                    break
+
+                if self.conversation_buffer:
+                    self.buffer_commit = partial(cursor.commit, position)
+                else:
+                    cursor.commit(position)
+
+        except (tweepy.error.TweepError, aiohttp.ClientError,
+                asyncio.TimeoutError) as err:
+            self.set_status(GeneralStatus.ERROR)
+            self.set_message(f'Request error, {err}')
+            return []
+
+        if not self.conversation_buffer:
+            self.set_status(GeneralStatus.ERROR)
+            self.set_message('No results found or stopped fetching!')
+            return []
+
+        conversation = self.conversation_buffer.popleft()
+
+        if not self.conversation_buffer:
+            self.commit_buffer()
+
+        self.set_status(GeneralStatus.IDLE)
+        self.set_message((
+            f'Added new conversation with {len(conversation)} entries '
+            f'(cache hit rate {self.status_cache.hit_rate():.0%}, '
+            f'{self.seen_tweet_ids.summary()})'
+        ))
+        return conversation
+
+    def get_conversation(self, query=None, language=None, geocode=None):
+        ''' Gets a conversation, optionally filtered using the given
+            parameters. Blocks until it is found, but all requests run on the
+            event loop of this api.
+                query:      search query
+                language:   display name of the available languages, which gets
+                            translated into the language code using the
+                            'available_language' dictionary
+                geocode:    string for only getting tweets from within a
+                            certain area, format -> 'lat,long,radius<ml | km>'
+        '''
+        return asyncio.run_coroutine_threadsafe(
+            self.get_conversation_async(query, language, geocode),
+            self.loop
+        ).result()
+
+    def change_credentials(self, filepath):
+        ''' Changes the Twitter api credentials with a credentials file from
+            the given path.
+        '''
+        credentials = self.read_in_credentials(filepath)
+
+        if credentials:
+            self.credentials = credentials
+            self.api = self.__create_api()
+            self.set_status(GeneralStatus.IDLE)
+            self.set_message('Successfully changed credentials file.')
+
+    def close(self):
+        ''' Closes the HTTP client and stops the event loop '''
+        async def close_session():
+            if self.session:
+                await self.session.close()
+
+        asyncio.run_coroutine_threadsafe(close_session(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.status_cache.close()
+        self.rejections.close()
@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+File name:  background_job.py
+Authors:    Erwin Meijerhof (S2377012)
+            Wessel Poelman  (S2976129)
+Date:       16-10-2026
+GitHub:     https://github.com/WPoelman/hci-final-project
+Description:
+    Cancellable job that runs on a worker thread. The work hands its results
+    to a thread-safe queue, which the gui empties from its own 'after'
+    callbacks, so no widget is ever touched from the worker thread. The work
+    reports its progress and checks regularly whether it got cancelled.
+Usage:
+    def work(job, path):
+        for chunk in read(path):
+            if job.cancelled():
+                return
+            job.put(chunk)
+
+    job = BackgroundJob(work, path)
+    job.start()
+    ...
+    for chunk in job.take():  # from the gui thread
+        ...
+"""
+
+import queue
+import threading
+
+
+class BackgroundJob:
+    ''' Runs a function on a worker thread.
+
+        work:   function that does the work, it is called with the job and
+                the given arguments, hands out results with 'put', reports
+                progress with 'progress' and should return once 'cancelled'
+                is True
+    '''
+
+    def __init__(self, work, *args):
+        self.work = work
+        self.args = args
+        self.results = queue.Queue()
+        self.progress = 0.0
+        self.error = None
+        self.finished = False
+
+        self.cancel_event = threading.Event()
+        self.thread = threading.Thread(target=self.__run, daemon=True)
+
+    def start(self):
+        ''' Starts the work on the worker thread '''
+        self.thread.start()
+
+    def __run(self):
+        try:
+            self.work(self, *self.args)
+        except Exception as err:
+            self.error = err
+        finally:
+            self.finished = True
+
+    def put(self, result):
+        ''' Hands a result to the gui, called from the work '''
+        self.results.put(result)
+
+    def take(self):
+        ''' Returns the results handed out so far, called from the gui '''
+        results = []
+
+        while True:
+            try:
+                results.append(self.results.get(block=False))
+            except queue.Empty:
+                return results
+
+    def cancel(self):
+        ''' Asks the work to stop '''
+        self.cancel_event.set()
+
+    def cancelled(self):
+        ''' Indicates if the job got cancelled '''
+        return self.cancel_event.is_set()
+
+    def is_done(self):
+        ''' Indicates if the work stopped and all results were taken '''
+        return self.finished and self.results.empty()
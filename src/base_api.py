@@ -0,0 +1,291 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+File name:  base_api.py
+Authors:    Erwin Meijerhof (S2377012)
+            Wessel Poelman  (S2976129)
+Date:       16-10-2026
+GitHub:     https://github.com/WPoelman/hci-final-project
+Description:
+    Base class of the api classes a Feed can use, the tweepy based TweepyApi
+    and the asyncio based AsyncTweepyApi. It has the state a Feed works with
+    (status, search settings, seen tweet ids, caches, search cursors and the
+    buffer of found conversations) and the methods that are the same for
+    both, so the Feed can rely on every api having them. The api classes
+    only add the way they talk to Twitter.
+Usage:
+    class TweepyApi(BaseApi):
+        def get_conversation(self, query=None, language=None, geocode=None):
+            ...
+"""
+
+from collections import deque
+from os.path import isfile
+
+from general_status import GeneralStatus
+from id_set import IdSet
+from search_cursor import SearchCursorStore
+from status_cache import RejectionCache, StatusCache
+
+
+class BaseApi:
+    ''' State and methods shared by the api classes.
+
+        cache_path:         path to the SQLite file of the status and
+                            rejection caches, None only keeps them in memory
+        search_state_path:  path to the json file with the search cursors,
+                            None only keeps them in memory
+    '''
+
+    def __init__(self, cache_path='../status_cache.db',
+                 search_state_path='../search_state.json'):
+        self.status = GeneralStatus.IDLE
+        self.message = ''
+
+        self.seen_tweet_ids = IdSet()
+        self.halt = False
+
+        # Ids of the newest tweet of every accepted conversation, a chain
+        # through one of these extends a conversation that was found before.
+        self.conversation_heads = IdSet()
+
+        # Adapted from:
+        # https://developer.twitter.com/en/docs/twitter-for-websites/supported-languages
+        self.available_languages = {
+            'English':                  'en',
+            'Arabic':                   'ar',
+            'Bengali':                  'bn',
+            'Czech':                    'cs',
+            'Danish':                   'da',
+            'German':                   'de',
+            'Greek':                    'el',
+            'Spanish':                  'es',
+            'Persian':                  'fa',
+            'Finnish':                  'fi',
+            'Filipino':                 'fil',
+            'French':                   'fr',
+            'Hebrew':                   'he',
+            'Hindi':                    'hi',
+            'Hungarian':                'hu',
+            'Indonesian':               'id',
+            'Italian':                  'it',
+            'Japanese':                 'ja',
+            'Korean':                   'ko',
+            'Malay':                    'msa',
+            'Dutch':                    'nl',
+            'Norwegian':                'no',
+            'Polish':                   'pl',
+            'Portuguese':               'pt',
+            'Romanian':                 'ro',
+            'Russian':                  'ru',
+            'Swedish':                  'sv',
+            'Thai':                     'th',
+            'Turkish':                  'tr',
+            'Ukrainian':                'uk',
+            'Urdu':                     'ur',
+            'Vietnamese':               'vi',
+            'Chinese (Simplified)':     'zh-cn',
+            'Chinese (Traditional)':    'zh-tw',
+        }
+
+        self.default_language = 'English'
+        self.min_conv_len = 3
+        self.max_conv_len = 10
+
+        # Tweets are kept as compact TweetRecords, see tweet_record.py. The
+        # full user object of the authors is only kept when this is set.
+        self.keep_full_user = False
+
+        # Tweets that were fetched before, also in earlier sessions. These
+        # get checked before going to the Twitter api.
+        self.status_cache = StatusCache(cache_path)
+
+        # Candidates of which the chain was rejected before, these do not get
+        # walked again.
+        self.rejections = RejectionCache(cache_path)
+
+        # Position in the search results per search, so searching continues
+        # where it stopped instead of starting at the newest results again.
+        self.search_cursors = SearchCursorStore(search_state_path)
+
+        # A single search page can contain multiple usable conversations,
+        # these are kept here and handed out before searching again.
+        self.conversation_buffer = deque()
+        self.buffer_key = None
+
+        # Saves the search position after the page the buffered conversations
+        # came from, called once the buffer is empty.
+        self.buffer_commit = None
+
+        # Number of search pages of which the chains are resolved at the same
+        # time, 1 means the Feed calls 'get_conversation' one call at a time.
+        self.workers = 1
+
+        self.credentials = None
+        self.api = None
+
+    def set_status(self, status):
+        ''' Sets the status of the api '''
+        print(f'New status api: {status}')
+        self.status = status
+
+    def set_message(self, message):
+        ''' Sets an message message '''
+        print(f'New message api: {message}')
+        self.message = message
+
+    def get_status(self):
+        ''' Returns the status of the api '''
+        return self.status.value
+
+    def get_message(self):
+        ''' Returns the latest message of the api '''
+        return self.message
+
+    def is_busy(self):
+        ''' Indicates if the api is busy '''
+        return (self.status != GeneralStatus.IDLE and
+                self.status != GeneralStatus.ERROR)
+
+    def read_in_credentials(self, path):
+        ''' Reads in twitter api credentials from the given path '''
+        if not path or not isfile(path):
+            self.set_status(GeneralStatus.ERROR)
+            self.set_message('Path to credentials file does not exist.')
+
+            return None
+
+        with open(path, 'r') as f:
+            credentials = {}
+            for line in f.readlines():
+                # Bit ugly, be we have no idea what files the user provides.
+                if '=' in line:
+                    items = line.strip().split('=')
+                    if len(items) == 2:
+                        credentials[items[0]] = items[1]
+
+        required_keys = {'API_KEY', 'API_SECRET',
+                         'ACCESS_TOKEN', 'ACCESS_SECRET'}
+
+        if required_keys != credentials.keys():
+            self.set_status(GeneralStatus.ERROR)
+            self.set_message(
+                'Not all keys are given or the credentials format is wrong.'
+            )
+
+            return None
+
+        return credentials
+
+    def clear_buffer(self):
+        ''' Drops the conversations left over from an earlier search page,
+            the position after that page is not saved
+        '''
+        self.conversation_buffer.clear()
+        self.buffer_commit = None
+
+    def commit_buffer(self):
+        ''' Saves the search position after the page the buffered
+            conversations came from, once all of them were handed out
+        '''
+        if self.buffer_commit:
+            self.buffer_commit()
+            self.buffer_commit = None
+
+    def accept_conversation(self, candidate_id, conversation):
+        ''' Checks if the conversation is wanted and adds it to the buffer
+            of found conversations if that is the case. Rejected candidates
+            are remembered.
+        '''
+        conversation_len = len(conversation)
+
+        # We only want to find conversations with 3-10 turns, as per the
+        # assignment instructions. We cannot specify this in calling the
+        # Twitter api, so we just have to try again if we do not find it here.
+        if (conversation_len >= self.min_conv_len and
+                conversation_len <= self.max_conv_len):
+
+            ids = {tweet.id for tweet in conversation}
+
+            if self.seen_tweet_ids.contains_all(ids):
+                self.rejections.add(candidate_id, 'seen', conversation_len)
+                self.set_status(GeneralStatus.RETRYING)
+                self.set_message(
+                    'Found already existing tweets, trying again...'
+                )
+                return False
+
+            # Replies often come in oldest first, so the chain of a newer
+            # reply contains a conversation that was accepted before. It
+            # replaces that conversation if it was not handed out yet,
+            # otherwise it is left out.
+            extended = {tweet.id for tweet in conversation[1:]
+                        if tweet.id in self.conversation_heads}
+
+            if extended:
+                buffered = [c for c in self.conversation_buffer
+                            if c[0].id not in extended]
+
+                if len(buffered) == len(self.conversation_buffer):
+                    self.rejections.add(candidate_id, 'seen',
+                                        conversation_len)
+                    self.set_status(GeneralStatus.RETRYING)
+                    self.set_message(
+                        'Found a longer version of an earlier conversation, '
+                        'trying again...'
+                    )
+                    return False
+
+                self.conversation_buffer.clear()
+                self.conversation_buffer.extend(buffered)
+
+            self.seen_tweet_ids.update(ids)
+            self.conversation_heads.update([conversation[0].id])
+            self.conversation_buffer.append(conversation)
+            return True
+
+        self.rejections.add(candidate_id,
+                            'length' if conversation else 'broken',
+                            conversation_len)
+
+        self.set_status(GeneralStatus.RETRYING)
+        self.set_message((
+            f'Conversation with length {conversation_len}, '
+            'trying again...'
+        ))
+        return False
+
+    def get_conversation(self, query=None, language=None, geocode=None):
+        ''' Gets a single conversation, optionally filtered using the given
+            parameters. Returns an empty list when none was found.
+        '''
+        raise NotImplementedError
+
+    def fetch_conversations(self, query=None, language=None, geocode=None,
+                            callback=None):
+        ''' Keeps fetching conversations until halted or until the search
+            results run out, every conversation gets passed to the callback.
+            Uses the same parameters as 'get_conversation'.
+        '''
+        while not self.halt:
+            conversation = self.get_conversation(query, language, geocode)
+
+            if not conversation:
+                return
+
+            callback(conversation)
+
+    def stream_conversations(self, query=None, language=None, geocode=None,
+                             callback=None):
+        ''' Keeps a stream of new replies open until halted, not every api
+            can do this.
+        '''
+        self.set_status(GeneralStatus.ERROR)
+        self.set_message('Streaming is not possible with this api.')
+
+    def change_credentials(self, filepath):
+        ''' Changes the Twitter api credentials with a credentials file from
+            the given path.
+        '''
+        raise NotImplementedError
@@ -0,0 +1,315 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+File name:  batch_sentiment.py
+Authors:    Erwin Meijerhof (S2377012)
+            Wessel Poelman  (S2976129)
+Date:       16-10-2026
+GitHub:     https://github.com/WPoelman/hci-final-project
+Description:
+    Scores whole batches of tweet texts with the VADER rules of nltk, using
+    NumPy instead of looking at every word in Python. Every distinct token
+    gets an id the first time it is seen, together with everything the
+    rules need to know about it (valence, booster, negation, caps), so the
+    lexicon and the rules are only looked at once per token. The tokens of a
+    batch are then scored as arrays: the valence, the caps emphasis, the
+    three boosters and negations before every word, the 'but' rule and the
+    punctuation emphasis.
+    The rare rules (idioms, 'least', 'kind of' and the other two word
+    boosters) are not vectorized, texts that might need them are scored by
+    nltk itself. Running this file checks that the compound scores are the
+    same as those of nltk for a conversation file.
+Usage:
+    scorer = BatchScorer()
+    scores = scorer.score(texts)
+
+    python batch_sentiment.py [conversation file]
+"""
+
+import re
+import string
+import sys
+
+import numpy as np
+from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+from conversation_file import ConversationReader
+
+# Texts with one of these (case insensitive) are scored by nltk itself.
+RARE_RULES = re.compile(
+    r'(?:^| )(?:least|kind of|sort of|just enough|the shit|the bomb|bad ass|'
+    r'yeah right|cut the mustard|kiss of death|hand to mouth)(?= |$)',
+    re.IGNORECASE
+)
+
+# Decay of a booster, by its distance to the word it boosts.
+BOOSTER_DECAY = (1.0, 0.95, 0.9)
+
+# Version of the scoring rules of BatchScorer, part of the key of cached
+# scores. Change it whenever a change to the scorer changes the scores.
+SCORER_VERSION = 1
+
+# Conversation file that is checked by default.
+CHECK_FILE = '../data/2021-04-09_22-25-53-English&covid-19.json'
+
+
+class BatchScorer:
+    ''' Scores batches of texts like SentimentIntensityAnalyzer.
+
+        analyzer:   analyzer with the lexicon to use, a new one by default
+    '''
+
+    def __init__(self, analyzer=None):
+        self.analyzer = analyzer or SentimentIntensityAnalyzer()
+        self.lexicon = self.analyzer.lexicon
+        self.constants = self.analyzer.constants
+        self.punc_list = set(self.constants.PUNC_LIST)
+
+        # Maps token -> id, the arrays below have the features by id.
+        self.token_ids = {}
+        self.size = 0
+        self.valence = np.zeros(1024)
+        self.in_lexicon = np.zeros(1024, dtype=bool)
+        self.scored = np.zeros(1024, dtype=bool)
+        self.booster = np.zeros(1024)
+        self.upper = np.zeros(1024, dtype=bool)
+        self.negated = np.zeros(1024, dtype=bool)
+        self.never = np.zeros(1024, dtype=bool)
+        self.so_this = np.zeros(1024, dtype=bool)
+        self.but = np.zeros(1024, dtype=bool)
+
+        # Number of texts scored by nltk, for reporting.
+        self.fallbacks = 0
+
+    def __grow(self):
+        ''' Doubles the size of the feature arrays '''
+        for name in ('valence', 'in_lexicon', 'scored', 'booster', 'upper',
+                     'negated', 'never', 'so_this', 'but'):
+            old = getattr(self, name)
+            new = np.zeros(2 * len(old), dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def __token_id(self, token):
+        ''' Returns the id of a token, adding it if it is new '''
+        token_id = self.token_ids.get(token)
+
+        if token_id is not None:
+            return token_id
+
+        if self.size == len(self.valence):
+            self.__grow()
+
+        token_id = self.size
+        self.size += 1
+        self.token_ids[token] = token_id
+
+        lower = token.lower()
+        booster = self.constants.BOOSTER_DICT.get(lower, 0.0)
+
+        self.in_lexicon[token_id] = lower in self.lexicon
+        self.valence[token_id] = self.lexicon.get(lower, 0.0)
+        # Boosters are never scored themselves, even if in the lexicon.
+        self.scored[token_id] = (lower in self.lexicon and
+                                 lower not in self.constants.BOOSTER_DICT)
+        self.booster[token_id] = booster
+        self.upper[token_id] = token.isupper()
+        self.negated[token_id] = self.constants.negated([token])
+        self.never[token_id] = token == 'never'
+        self.so_this[token_id] = token in ('so', 'this')
+        self.but[token_id] = lower == 'but'
+
+        return token_id
+
+    def tokenize(self, text):
+        ''' Returns the words and emoticons of a text, the same as SentiText
+            of nltk: tokens of at least two characters, with the punctuation
+            before or after a word taken off.
+        '''
+        no_punc_text = self.constants.REGEX_REMOVE_PUNCTUATION.sub('', text)
+        words_only = {w for w in no_punc_text.split() if len(w) > 1}
+        tokens = []
+
+        for token in text.split():
+            if len(token) <= 1:
+                continue
+
+            # A word never has punctuation in it, so only the whole run of
+            # punctuation at the start or the end can come off.
+            word = token.rstrip(string.punctuation)
+            punctuation = token[len(word):]
+
+            if not punctuation:
+                word = token.lstrip(string.punctuation)
+                punctuation = token[:len(token) - len(word)]
+
+            if punctuation in self.punc_list and word in words_only:
+                token = word
+
+            tokens.append(token)
+
+        return tokens
+
+    def score(self, texts):
+        ''' Returns an array with the compound score of every text '''
+        texts = list(texts)
+        scores = np.zeros(len(texts))
+
+        ids = []
+        lengths = np.zeros(len(texts), dtype=np.int64)
+        exclamations = np.zeros(len(texts))
+        questions = np.zeros(len(texts))
+        fallbacks = []
+
+        for n, text in enumerate(texts):
+            tokens = self.tokenize(text)
+
+            if RARE_RULES.search(' '.join(tokens)):
+                fallbacks.append(n)
+                continue
+
+            ids.extend(self.__token_id(token) for token in tokens)
+            lengths[n] = len(tokens)
+            exclamations[n] = text.count('!')
+            questions[n] = text.count('?')
+
+        if ids:
+            sums = self.__sum_valences(np.array(ids, dtype=np.int64), lengths)
+            scores = self.__compound(sums, exclamations, questions)
+
+        for n in fallbacks:
+            scores[n] = self.analyzer.polarity_scores(texts[n])['compound']
+
+        self.fallbacks += len(fallbacks)
+
+        return scores
+
+    def __sum_valences(self, ids, lengths):
+        ''' Returns the sum of the valences of the tokens of every text, the
+            tokens of all texts are given one after the other
+        '''
+        c = self.constants
+        texts = len(lengths)
+        doc = np.repeat(np.arange(texts), lengths)
+        starts = np.cumsum(lengths) - lengths
+        position = np.arange(len(ids)) - starts[doc]
+
+        # nltk looks at the context of the first time a token shows up in a
+        # text, for every time it shows up.
+        _, first, inverse = np.unique(doc * (self.size + 1) + ids,
+                                      return_index=True,
+                                      return_inverse=True)
+        at = first[inverse.reshape(-1)]
+        first_position = position[at]
+
+        # Some but not all tokens of the text in caps.
+        uppers = np.bincount(doc, weights=self.upper[ids], minlength=texts)
+        cap_diff = ((uppers > 0) & (uppers < lengths))[doc]
+
+        scored = self.scored[ids]
+        valence = self.valence[ids].copy()
+        emphasis = scored & self.upper[ids] & cap_diff
+        valence[emphasis] += np.where(valence[emphasis] > 0,
+                                      c.C_INCR, -c.C_INCR)
+
+        context = [None] + [ids[np.maximum(at - k, 0)] for k in (1, 2, 3)]
+
+        for k in (1, 2, 3):
+            before = context[k]
+            applies = (scored & (first_position >= k) &
+                       ~self.in_lexicon[before])
+
+            booster = self.booster[before]
+            booster = np.where(valence < 0, -booster, booster)
+            booster += np.where(
+                (self.booster[before] != 0) & self.upper[before] & cap_diff,
+                np.where(valence > 0, c.C_INCR, -c.C_INCR),
+                0.0
+            )
+            valence = np.where(applies,
+                               valence + booster * BOOSTER_DECAY[k - 1],
+                               valence)
+
+            # The negation and 'never so' rules of '_never_check'.
+            if k == 1:
+                special = np.zeros(len(ids), dtype=bool)
+            elif k == 2:
+                special = self.never[before] & self.so_this[context[1]]
+            else:
+                special = ((self.never[before] & self.so_this[context[2]]) |
+                           self.so_this[context[1]])
+
+            valence = np.where(
+                applies & special,
+                valence * (1.5 if k == 2 else 1.25),
+                np.where(applies & ~special & self.negated[before],
+                         valence * c.N_SCALAR,
+                         valence)
+            )
+
+        sentiments = np.where(scored, valence, 0.0)
+
+        # Everything before the first 'but' counts half, after it one and a
+        # half times.
+        but_position = np.full(texts, np.iinfo(np.int64).max)
+        is_but = self.but[ids]
+        np.minimum.at(but_position, doc[is_but], position[is_but])
+        but_at = but_position[doc]
+        has_but = but_at < len(ids)
+        sentiments = np.where(has_but & (position < but_at), sentiments * 0.5,
+                              np.where(has_but & (position > but_at),
+                                       sentiments * 1.5,
+                                       sentiments))
+
+        return np.bincount(doc, weights=sentiments, minlength=texts)
+
+    def __compound(self, sums, exclamations, questions):
+        ''' Returns the compound scores from the sums of the valences and the
+            number of exclamation and question marks
+        '''
+        amplifier = np.minimum(exclamations, 4) * 0.292
+        amplifier += np.where(questions > 3, 0.96,
+                              np.where(questions > 1, questions * 0.18, 0.0))
+
+        sums = sums + np.sign(sums) * amplifier
+        compound = sums / np.sqrt(sums * sums + 15)
+
+        return np.round(compound, 4)
+
+
+def check_conformance(path=CHECK_FILE, tolerance=1e-4):
+    ''' Compares the compound scores of the BatchScorer with those of nltk
+        for the tweets of a conversation file, returns the texts that differ
+        more than the tolerance
+    '''
+    scorer = BatchScorer()
+    texts = [tweet['text'] for conversation in ConversationReader(path)
+             for tweet in conversation]
+
+    scores = scorer.score(texts)
+    expected = [scorer.analyzer.polarity_scores(text)['compound']
+                for text in texts]
+
+    return [
+        (text, score, expected_score)
+        for text, score, expected_score in zip(texts, scores, expected)
+        if abs(score - expected_score) > tolerance
+    ]
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else CHECK_FILE
+    differences = check_conformance(path)
+
+    for text, score, expected in differences:
+        print(f'{score:8.4f} instead of {expected:8.4f}: {text!r}')
+
+    if differences:
+        exit(1)
+
+    print(f'All compound scores of {path} are the same as those of nltk')
+
+
+if __name__ == '__main__':
+    main()
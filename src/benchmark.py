@@ -0,0 +1,274 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+File name:  benchmark.py
+Authors:    Erwin Meijerhof (S2377012)
+            Wessel Poelman  (S2976129)
+Date:       16-10-2026
+GitHub:     https://github.com/WPoelman/hci-final-project
+Description:
+    Benchmarks the harvest of the TweepyApi against the ReplayApi of
+    replay_api.py, using generated conversations with a chosen chain length
+    distribution, duplicate rate, deleted tweet rate and latency. For every
+    scenario it reports the api calls per accepted conversation, the
+    conversations per minute, the p50/p99 time per accepted conversation, the
+    rejections by chain length and the peak memory. The results are written
+    to a json file, so runs of different commits can be compared.
+Usage:
+    python benchmark.py [output file] [scenario ...]
+"""
+
+import json
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+from feed import TweepyApi
+from fake_twitter import TweetCorpus
+from replay_api import ReplayApi
+
+# Query that every generated candidate matches.
+QUERY = 'benchmark'
+
+# The scenarios that run by default.
+#   conversations:  number of generated conversations
+#   lengths:        (shortest, longest, distribution) of the reply chains,
+#                   'uniform' or 'geometric' (short chains are more common)
+#   duplicates:     chance that a tweet halfway a chain also shows up in the
+#                   search results, its chain is part of a longer one
+#   missing:        chance that a tweet looks deleted
+#   latency:        seconds every api call takes
+#   workers:        1 uses 'get_conversation', more uses
+#                   'fetch_conversations' with that many workers
+SCENARIOS = {
+    'baseline': {
+        'conversations': 500,
+        'lengths': (1, 15, 'uniform'),
+        'duplicates': 0.0,
+        'missing': 0.0,
+        'latency': 0.0,
+        'workers': 1,
+    },
+    'short-chains': {
+        'conversations': 500,
+        'lengths': (1, 15, 'geometric'),
+        'duplicates': 0.0,
+        'missing': 0.0,
+        'latency': 0.0,
+        'workers': 1,
+    },
+    'duplicates': {
+        'conversations': 500,
+        'lengths': (1, 15, 'uniform'),
+        'duplicates': 0.3,
+        'missing': 0.0,
+        'latency': 0.0,
+        'workers': 1,
+    },
+    'deleted-tweets': {
+        'conversations': 500,
+        'lengths': (1, 15, 'uniform'),
+        'duplicates': 0.0,
+        'missing': 0.05,
+        'latency': 0.0,
+        'workers': 1,
+    },
+    'latency': {
+        'conversations': 300,
+        'lengths': (1, 15, 'uniform'),
+        'duplicates': 0.1,
+        'missing': 0.0,
+        'latency': 0.05,
+        'workers': 1,
+    },
+    'latency-concurrent': {
+        'conversations': 300,
+        'lengths': (1, 15, 'uniform'),
+        'duplicates': 0.1,
+        'missing': 0.0,
+        'latency': 0.05,
+        'workers': 4,
+    },
+}
+
+
+def chain_length(rng, shortest, longest, distribution):
+    ''' Draws the length of a single reply chain '''
+    if distribution == 'geometric':
+        length = shortest
+
+        while length < longest and rng.random() < 0.75:
+            length += 1
+
+        return length
+
+    return rng.randint(shortest, longest)
+
+
+def generate_corpus(conversations, lengths, duplicates, seed=0):
+    ''' Generates conversations, every one of them a root tweet with a reply
+        chain. The newest reply of every chain matches the query, the other
+        replies only match with the duplicate chance. Returns the corpus and
+        the number of conversations of every length.
+    '''
+    rng = random.Random(seed)
+    corpus = TweetCorpus()
+    generated = Counter()
+    tweet_id = 10 ** 15
+
+    for _ in range(conversations):
+        length = chain_length(rng, *lengths)
+        generated[length] += 1
+
+        parent = None
+
+        # The root and then the replies, from old to new.
+        for turn in range(length + 1):
+            tweet_id += 1
+            newest = turn == length
+
+            matches = newest or (parent and rng.random() < duplicates)
+            user_id = rng.randint(1, 1000)
+
+            corpus.add({
+                'created_at': 'Fri Apr 09 20:00:00 +0000 2021',
+                'id': tweet_id,
+                'text': f'{QUERY if matches else "reply"} {tweet_id}',
+                'in_reply_to_user_id': parent and parent['user']['id'],
+                'in_reply_to_status_id': parent and parent['id'],
+                'in_reply_to_screen_name': (parent and
+                                            parent['user']['screen_name']),
+                'user': {'id': user_id, 'screen_name': f'user{user_id}'},
+            })
+
+            parent = corpus.tweets[tweet_id]
+
+    return corpus, generated
+
+
+def percentile(values, fraction):
+    ''' Returns the value at the given fraction of the sorted values '''
+    if not values:
+        return None
+
+    values = sorted(values)
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+
+def run_scenario(name, scenario, seed=0):
+    ''' Runs a single scenario and returns its results '''
+    corpus, generated = generate_corpus(scenario['conversations'],
+                                        scenario['lengths'],
+                                        scenario['duplicates'],
+                                        seed)
+
+    backend = ReplayApi(corpus,
+                        latency=scenario['latency'],
+                        limits=None,
+                        missing_rate=scenario['missing'],
+                        seed=seed)
+
+    tracemalloc.start()
+
+    api = TweepyApi(cache_path=None, search_state_path=None, backend=backend)
+    api.workers = scenario['workers']
+
+    # The replay api has no rate limit, so the scheduler should not pace.
+    for bucket in api.scheduler.buckets.values():
+        bucket.limit = bucket.remaining = 10 ** 9
+
+    durations = []
+    start = last = time.perf_counter()
+
+    def add_conversation(conversation):
+        nonlocal last
+
+        now = time.perf_counter()
+        durations.append(now - last)
+        last = now
+
+    if api.workers > 1:
+        api.fetch_conversations(QUERY, callback=add_conversation)
+    else:
+        while api.get_conversation(QUERY):
+            add_conversation(None)
+
+    elapsed = time.perf_counter() - start
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    accepted = len(durations)
+    calls = sum(backend.calls.values())
+
+    rejections = Counter()
+    for reason, length, _ in api.rejections.rejections.values():
+        rejections[f'{reason}:{length}'] += 1
+
+    return {
+        'scenario': name,
+        'settings': dict(scenario, lengths=list(scenario['lengths'])),
+        'generated_by_length': dict(sorted(generated.items())),
+        'accepted': accepted,
+        'calls': dict(backend.calls),
+        'calls_per_conversation': calls / accepted if accepted else None,
+        'conversations_per_minute': accepted / elapsed * 60,
+        'p50_seconds': percentile(durations, 0.5),
+        'p99_seconds': percentile(durations, 0.99),
+        'seconds': elapsed,
+        'rejections': dict(sorted(rejections.items())),
+        'rejection_ratio': (len(api.rejections.rejections) /
+                            max(len(api.rejections.rejections) + accepted, 1)),
+        'peak_memory_bytes': peak_memory,
+    }
+
+
+def current_commit():
+    ''' Returns the current git commit, if there is one '''
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True,
+                              text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    output_path = sys.argv[1] if len(sys.argv) > 1 else 'benchmark.json'
+    names = sys.argv[2:] or list(SCENARIOS)
+
+    for name in names:
+        if name not in SCENARIOS:
+            print(f'Unknown scenario {name}, pick from {", ".join(SCENARIOS)}')
+            exit(1)
+
+    results = []
+
+    for name in names:
+        result = run_scenario(name, SCENARIOS[name])
+        results.append(result)
+
+        print((
+            f'{name:20} {result["accepted"]:5} conversations, '
+            f'{result["calls_per_conversation"] or 0:6.2f} calls/conv, '
+            f'{result["conversations_per_minute"]:9.0f} conv/min, '
+            f'p50 {(result["p50_seconds"] or 0) * 1000:7.2f} ms, '
+            f'p99 {(result["p99_seconds"] or 0) * 1000:7.2f} ms, '
+            f'peak {result["peak_memory_bytes"] / 1e6:6.1f} MB'
+        ), file=sys.stderr)
+
+    with open(output_path, 'w') as f:
+        json.dump({
+            'commit': current_commit(),
+            'time': time.time(),
+            'results': results,
+        }, f, indent=2)
+
+    print(f'Results written to {output_path}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
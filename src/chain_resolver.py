@@ -0,0 +1,257 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+File name:  chain_resolver.py
+Authors:    Erwin Meijerhof (S2377012)
+            Wessel Poelman  (S2976129)
+Date:       16-10-2026
+GitHub:     https://github.com/WPoelman/hci-final-project
+Description:
+    Resolves Twitter reply chains in bulk. Instead of walking up every reply
+    chain with one 'get_status' call per hop, the parents of all open chains
+    of a search page are gathered and looked up together using the
+    statuses/lookup endpoint (100 ids per call), one chain level at a time.
+    This means the number of calls depends on the number of levels instead
+    of the number of tweets. All tweets that were found end up in a shared
+    reply graph, so a chain that reaches a part of a conversation that is
+    already known gets the rest of that chain right away.
+Usage:
+    Used by the TweepyApi classes in feed.py and coursework3.py.
+"""
+
+import threading
+
+from tweet_record import TweetRecord
+
+# Maximum number of ids the statuses/lookup endpoint accepts per call.
+LOOKUP_BATCH_SIZE = 100
+
+# States of a chain after extending it with the reply graph.
+DONE = 'done'
+OPEN = 'open'
+BROKEN = 'broken'
+
+
+class ReplyGraph:
+    ''' In-process graph of all known tweets (id -> TweetRecord, which
+        contains the id of its parent) that all chain walks share.
+
+        max_nodes:  the graph starts over once it holds more tweets than
+                    this, the status cache still has them after that
+    '''
+
+    def __init__(self, max_nodes=1000000):
+        self.max_nodes = max_nodes
+        self.nodes = {}
+        self.missing = set()
+
+        # Maps id -> number of tweets in the chain from that tweet up to
+        # (not including) the main 'parent', for completely known chains.
+        self.depths = {}
+
+        self.lock = threading.Lock()
+
+    def add_many(self, tweets):
+        ''' Adds tweet records to the graph '''
+        with self.lock:
+            if len(self.nodes) + len(tweets) > self.max_nodes:
+                self.nodes = {}
+                self.depths = {}
+                self.missing = set()
+
+            for tweet in tweets:
+                self.nodes[tweet.id] = tweet
+
+    def mark_missing(self, ids):
+        ''' Remembers tweets that could not be found '''
+        with self.lock:
+            self.missing.update(ids)
+
+    def depth(self, tweet_id):
+        ''' Returns the known depth of the chain starting at the tweet, None
+            if part of it is unknown or BROKEN if part of it is missing.
+        '''
+        # Local references, the graph can be started over by another thread.
+        nodes, depths, missing = self.nodes, self.depths, self.missing
+        path = []
+
+        while tweet_id not in depths:
+            if tweet_id in missing:
+                return BROKEN
+
+            tweet = nodes.get(tweet_id)
+
+            if not tweet:
+                return None
+
+            if not tweet.parent_id:
+                depths[tweet_id] = 0
+                break
+
+            path.append(tweet_id)
+            tweet_id = tweet.parent_id
+
+        depth = depths[tweet_id]
+
+        for tweet_id in reversed(path):
+            depth += 1
+            depths[tweet_id] = depth
+
+        return depth
+
+    def extend(self, chain, max_len):
+        ''' Extends the chain with the known ancestors of its last tweet.
+            Returns DONE if the chain is complete, BROKEN if one of the
+            ancestors is missing or OPEN if the parent of the last tweet
+            needs to be looked up.
+        '''
+        depth = self.depth(chain[-1].parent_id)
+
+        if depth == BROKEN:
+            return BROKEN
+
+        # A known depth means the rest of the chain is known, so we can tell
+        # right away how much of it is needed.
+        if depth is not None:
+            needed = min(depth, max_len - len(chain))
+        else:
+            needed = max_len - len(chain)
+
+        while needed > 0:
+            parent = self.nodes.get(chain[-1].parent_id)
+
+            if not parent:
+                return OPEN
+            if not parent.parent_id:
+                return DONE
+
+            chain.append(parent)
+            needed -= 1
+
+        return DONE
+
+
+class ChainResolver:
+    ''' Resolves the reply chains of multiple candidate tweets at once.
+
+        lookup:         function that takes a list of at most
+                        LOOKUP_BATCH_SIZE tweet ids and returns the raw tweet
+                        dicts that could be found (deleted or protected
+                        tweets are simply left out)
+        max_conv_len:   maximum number of turns in a single conversation
+        halted:         function that indicates resolving should stop
+        cache:          optional StatusCache that is checked before looking
+                        up tweets with the api
+        graph:          optional ReplyGraph to share with other resolvers
+        keep_user:      keep the full user object of every tweet, instead of
+                        only the id and screen name of the author
+    '''
+
+    def __init__(self, lookup, max_conv_len=10, halted=None, cache=None,
+                 graph=None, keep_user=False):
+        self.lookup = lookup
+        self.max_conv_len = max_conv_len
+        self.halted = halted if halted else (lambda: False)
+        self.cache = cache
+        self.graph = graph if graph else ReplyGraph()
+        self.keep_user = keep_user
+
+        # Number of lookup calls done, useful for keeping an eye on the rate
+        # limit usage.
+        self.lookup_calls = 0
+
+    def clean(self, response):
+        ''' Turns a raw tweet into a TweetRecord '''
+        return TweetRecord.from_dict(response, self.keep_user)
+
+    def lookup_parents(self, ids):
+        ''' Looks up the given tweet ids in batches and returns a dict with
+            the tweet records by id. Tweets that are in the cache do not get
+            looked up again.
+        '''
+        ids = list(ids)
+        found = {}
+
+        if self.cache:
+            found = self.cache.get_many(ids)
+            ids = [i for i in ids if i not in found]
+
+        for start in range(0, len(ids), LOOKUP_BATCH_SIZE):
+            if self.halted():
+                break
+
+            self.lookup_calls += 1
+
+            batch = ids[start:start + LOOKUP_BATCH_SIZE]
+            fetched = [self.clean(response) for response in self.lookup(batch)]
+
+            if self.cache:
+                self.cache.put_many(fetched)
+
+            found.update((tweet.id, tweet) for tweet in fetched)
+
+        return found
+
+    def resolve(self, responses):
+        ''' Resolves the reply chains of the given raw candidate tweets. All
+            candidates should be replies. Returns a conversation (list of
+            tweet records, from the newest reply to the oldest) for every
+            candidate in the same order as the given responses. Chains that
+            could not be completed, for example because a tweet was deleted,
+            or that were halted result in an empty list.
+
+            The same exit conditions as walking a single chain apply: a chain
+            is done once the next parent is the main 'parent' of the
+            conversation or once the maximum number of turns is reached.
+            Parts of chains that are already in the reply graph are spliced
+            in without looking them up.
+        '''
+        chains = [[self.clean(response)] for response in responses]
+
+        # Candidates can be the parent of other candidates, either now or in
+        # a later search, so they are cached as well.
+        if self.cache:
+            self.cache.put_many([chain[0] for chain in chains])
+
+        self.graph.add_many([chain[0] for chain in chains])
+
+        open_chains = []
+
+        for chain in chains:
+            state = self.graph.extend(chain, self.max_conv_len)
+
+            if state == OPEN:
+                open_chains.append(chain)
+            elif state == BROKEN:
+                chain.clear()
+
+        while open_chains:
+            if self.halted():
+                return [[] for _ in chains]
+
+            wanted = {
+                chain[-1].parent_id for chain in open_chains
+            }
+            parents = self.lookup_parents(wanted)
+
+            if self.halted():
+                return [[] for _ in chains]
+
+            self.graph.add_many(list(parents.values()))
+            self.graph.mark_missing(wanted - parents.keys())
+
+            still_open = []
+
+            for chain in open_chains:
+                state = self.graph.extend(chain, self.max_conv_len)
+
+                if state == OPEN:
+                    still_open.append(chain)
+                elif state == BROKEN:
+                    # Missing link in the chain, the whole chain is useless.
+                    chain.clear()
+
+            open_chains = still_open
+
+        return chains
@@ -0,0 +1,184 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+File name:  checkpoint.py
+Authors:    Erwin Meijerhof (S2377012)
+            Wessel Poelman  (S2976129)
+Date:       16-10-2026
+GitHub:     https://github.com/WPoelman/hci-final-project
+Description:
+    Checkpoints of the running harvest session, so a crash only loses the
+    last few seconds of work. Accepted conversations are appended to a json
+    lines file by a writer thread as they come in. Every few seconds the rest
+    of the session (search parameters, search cursor and seen tweet ids) is
+    written as well, always to a temporary file first that is renamed over
+    the old one, so a crash halfway never leaves a broken checkpoint behind.
+Usage:
+    checkpoint = SessionCheckpoint('session')
+    checkpoint.begin(search, seen_ids, get_cursor)
+    checkpoint.add(conversation)
+    ...
+    session = checkpoint.load()
+"""
+
+import json
+import os
+import threading
+import time
+from os.path import isfile, join
+
+from conversation_file import ConversationWriter
+from id_set import IdSet
+
+
+def atomic_write(path, data):
+    ''' Writes bytes to a file using a rename, so the file is either the old
+        or the new version, never something in between.
+    '''
+    tmp_path = f'{path}.tmp'
+
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, path)
+
+
+class SessionCheckpoint:
+    ''' Checkpoints of a single harvest session in a directory.
+
+        path:       directory the checkpoint files are kept in
+        interval:   seconds between two checkpoints of the session state
+    '''
+
+    def __init__(self, path='session', interval=5.0):
+        self.path = path
+        self.interval = interval
+
+        self.conversations_path = join(path, 'conversations.jsonl')
+        self.state_path = join(path, 'state.json')
+        self.seen_ids_path = join(path, 'seen_ids.bin')
+
+        self.writer = None
+        self.search = None
+        self.seen_ids = None
+        self.get_cursor = None
+
+        self.dirty = False
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def begin(self, search, seen_ids, get_cursor=None, resume=False):
+        ''' Starts checkpointing a session.
+                search:     dict with the search parameters of the session
+                seen_ids:   IdSet with the seen tweet ids
+                get_cursor: function that returns the search cursor state
+                resume:     continue the checkpoint of the previous session
+                            instead of starting over
+        '''
+        self.end()
+
+        os.makedirs(self.path, exist_ok=True)
+
+        if not resume:
+            for path in (self.conversations_path, self.seen_ids_path):
+                if isfile(path):
+                    os.remove(path)
+        elif isfile(self.conversations_path):
+            # A line cut off by a crash should not take the next one with it.
+            with open(self.conversations_path, 'rb+') as f:
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+
+                    if f.read(1) != b'\n':
+                        f.write(b'\n')
+
+        self.writer = ConversationWriter(self.conversations_path)
+        self.search = search
+        self.seen_ids = seen_ids
+        self.get_cursor = get_cursor if get_cursor else (lambda: None)
+
+        self.write()
+
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self.__run, daemon=True)
+        self.thread.start()
+
+    def add(self, conversation):
+        ''' Adds an accepted conversation to the checkpoint '''
+        if self.writer:
+            self.writer.write(conversation)
+            self.dirty = True
+
+    def __run(self):
+        ''' Writes the session state every interval, if anything changed '''
+        while not self.stopped.wait(self.interval):
+            if self.dirty:
+                self.write()
+
+    def write(self):
+        ''' Writes the session state '''
+        with self.lock:
+            self.dirty = False
+
+            atomic_write(self.seen_ids_path, self.seen_ids.to_bytes())
+            atomic_write(self.state_path, json.dumps({
+                'search': self.search,
+                'cursor': self.get_cursor(),
+                'saved_at': time.time(),
+            }).encode('utf-8'))
+
+    def end(self):
+        ''' Stops checkpointing, after writing what is left '''
+        if not self.thread:
+            return
+
+        self.stopped.set()
+        self.thread.join()
+        self.thread = None
+
+        self.writer.close()
+        self.writer = None
+        self.write()
+
+    def load(self):
+        ''' Returns the last checkpointed session as a dict with the search
+            parameters, the cursor state, the conversations (lists of tweet
+            dicts) and the seen ids, or None if there is none.
+        '''
+        if not isfile(self.state_path):
+            return None
+
+        try:
+            with open(self.state_path) as f:
+                session = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        session['conversations'] = []
+
+        if isfile(self.conversations_path):
+            with open(self.conversations_path) as f:
+                for line in f:
+                    try:
+                        session['conversations'].append(json.loads(line))
+                    except ValueError:
+                        # The last line might have been cut off by a crash.
+                        continue
+
+        seen_ids = IdSet()
+
+        if isfile(self.seen_ids_path):
+            with open(self.seen_ids_path, 'rb') as f:
+                seen_ids = IdSet.from_bytes(f.read())
+
+        # Conversations written after the last state checkpoint are seen too.
+        for conversation in session['conversations']:
+            seen_ids.update(tweet['id'] for tweet in conversation)
+
+        session['seen_ids'] = seen_ids
+
+        return session
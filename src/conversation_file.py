@@ -0,0 +1,199 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+File name:  conversation_file.py
+Authors:    Erwin Meijerhof (S2377012)
+            Wessel Poelman  (S2976129)
+Date:       16-10-2026
+GitHub:     https://github.com/WPoelman/hci-final-project
+Description:
+    Reading and writing conversation files. Besides the original json format
+    ({"conversations": [...]}) there is a json lines format with a single
+    conversation per line. The ConversationWriter appends conversations to
+    such a file on a writer thread as they come in, so saving never has to
+    write everything at once and never blocks the gui. The
+    ConversationReader goes through both formats one conversation at a time,
+    so big files never have to be in memory as a whole.
+Usage:
+    writer = ConversationWriter('conversations.jsonl')
+    writer.write(conversation)
+    ...
+    writer.close()
+    for conversation in ConversationReader('conversations.jsonl'):
+        ...
+"""
+
+import codecs
+import json
+import os
+import queue
+import re
+import threading
+
+# The key of the conversations array up to its first character.
+ARRAY_START = re.compile(r'"conversations"\s*:\s*(\S)')
+
+
+class ConversationReader:
+    ''' Reads the conversations (lists of tweet dicts) of a json or json
+        lines conversation file one by one. The json file is parsed element
+        by element from the 'conversations' array, so only a block of the
+        file and a single conversation are in memory at a time.
+
+        path:       path to the conversation file
+        block_size: number of bytes read at a time
+    '''
+
+    def __init__(self, path, block_size=1 << 16):
+        self.path = path
+        self.block_size = block_size
+        self.size = os.path.getsize(path)
+        self.bytes_read = 0
+
+    def progress(self):
+        ''' Returns the fraction of the file that has been read '''
+        return self.bytes_read / self.size if self.size else 1.0
+
+    def __iter__(self):
+        with open(self.path, 'rb') as f:
+            if self.path.endswith('.jsonl'):
+                for line in f:
+                    self.bytes_read += len(line)
+
+                    if line.strip():
+                        yield json.loads(line)
+            else:
+                yield from self.__read_array(f)
+
+    def __read_array(self, f):
+        ''' Parses the elements of the 'conversations' array one by one '''
+        decoder = json.JSONDecoder()
+        text_decoder = codecs.getincrementaldecoder('utf-8')()
+        buffer = ''
+        pos = 0
+        at_end = False
+
+        def read_block():
+            nonlocal buffer, pos, at_end
+
+            block = f.read(self.block_size)
+            self.bytes_read += len(block)
+            at_end = not block
+
+            # Throw away what was already parsed, so the buffer stays small.
+            buffer = buffer[pos:] + text_decoder.decode(block, final=at_end)
+            pos = 0
+
+        # Everything up to and including the opening bracket of the array.
+        while True:
+            start = buffer.find('"conversations"')
+            match = start >= 0 and ARRAY_START.match(buffer, start)
+
+            if match:
+                if match.group(1) != '[':
+                    raise ValueError('Conversations are not a list')
+
+                pos = match.end()
+                break
+
+            if at_end:
+                raise ValueError('No conversations found in the file')
+
+            read_block()
+
+        while True:
+            # Skip the whitespace and commas between the elements.
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                    pos += 1
+
+                if pos < len(buffer) or at_end:
+                    break
+
+                read_block()
+
+            if pos >= len(buffer):
+                raise ValueError('Conversation file ends too early')
+
+            if buffer[pos] == ']':
+                return
+
+            try:
+                conversation, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Most likely the element is not completely read yet.
+                if at_end:
+                    raise
+
+                read_block()
+                continue
+
+            pos = end
+            yield conversation
+
+
+def read_conversations(path):
+    ''' Returns the conversations (lists of tweet dicts) in a json or json
+        lines conversation file.
+    '''
+    return list(ConversationReader(path))
+
+
+class ConversationWriter:
+    ''' Appends conversations to a json lines file on a writer thread.
+
+        path:   path to the json lines file, an existing file is added to
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self.queue = queue.Queue()
+        self.written = 0
+
+        # Last error of the writer thread, it cannot report errors itself so
+        # the user of the writer has to check this.
+        self.error = None
+
+        self.file = open(path, 'a')
+        self.thread = threading.Thread(target=self.__run, daemon=True)
+        self.thread.start()
+
+    def write(self, conversation):
+        ''' Queues a conversation (list of TweetRecords) to be written '''
+        self.queue.put(conversation)
+
+    def __run(self):
+        ''' Writes the queued conversations, flushing once the queue is
+            empty. A None in the queue stops the writer.
+        '''
+        while True:
+            conversation = self.queue.get()
+
+            try:
+                while conversation is not None:
+                    self.file.write(json.dumps(
+                        [tweet.to_dict() for tweet in conversation]
+                    ) + '\n')
+                    self.written += 1
+
+                    try:
+                        conversation = self.queue.get(block=False)
+                    except queue.Empty:
+                        break
+
+                self.file.flush()
+            except OSError as err:
+                self.error = err
+
+            if conversation is None:
+                try:
+                    self.file.close()
+                except OSError as err:
+                    self.error = err
+                return
+
+    def close(self):
+        ''' Writes what is left in the queue and closes the file '''
+        self.queue.put(None)
+        self.thread.join()
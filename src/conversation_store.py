@@ -0,0 +1,186 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+File name:  conversation_store.py
+Authors:    Erwin Meijerhof (S2377012)
+            Wessel Poelman  (S2976129)
+Date:       16-10-2026
+GitHub:     https://github.com/WPoelman/hci-final-project
+Description:
+    Columns with the attributes the analysis tab filters on (participants,
+    turns, sentiment of the conversation and the lowest difference in
+    sentiment), one NumPy array per attribute. They are filled once while a
+    file loads, after that a filter is a single boolean mask over the arrays
+    instead of a loop over all Conversation objects. The sentiment columns
+    need the sentiment scores of every conversation, these are computed by
+    the SentimentPool while the file loads, since the treeview shows them
+    anyway.
+    Once the file is loaded, the rows are also put in buckets by their
+    turns, participants and sentiment, within a bucket sorted by the lowest
+    difference. A filter picks the buckets in the ranges of the sliders and
+    the sentiment menu, and bisection finds the rows of every bucket that
+    pass the threshold. So a filter costs about as much as the number of
+    conversations it keeps, not the number of loaded conversations.
+Usage:
+    store = ConversationStore()
+    store.extend(conversations)
+    store.build_indexes()
+    rows = store.filter(2, 10, 3, 10, 'Positive', 0.1)
+"""
+
+import numpy as np
+
+# The sentiments of a conversation, stored by their index.
+SENTIMENTS = ('Negative', 'Positive', 'Neutral')
+
+# The attributes, the names of the arrays.
+COLUMNS = ('participants', 'turns', 'sentiment', 'lowest_diff')
+
+# Filters with at most this many rows in the store just look at all rows.
+SCAN_SIZE = 10000
+
+
+class ConversationStore:
+    ''' Filter attributes of conversations, the row of a conversation is its
+        index in the list of loaded conversations.
+
+        capacity:   number of rows to start with, the arrays grow as needed
+    '''
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.clear()
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        ''' Removes all conversations '''
+        self.size = 0
+        self.participants = np.zeros(self.capacity, dtype=np.int32)
+        self.turns = np.zeros(self.capacity, dtype=np.int32)
+        self.sentiment = np.zeros(self.capacity, dtype=np.int8)
+        self.lowest_diff = np.zeros(self.capacity)
+
+        # The index of 'build_indexes', None when conversations were added
+        # after building it.
+        self.indexes = None
+
+    def __grow(self, needed):
+        ''' Makes room for at least the given number of rows '''
+        capacity = len(self.turns)
+
+        while capacity < needed:
+            capacity *= 2
+
+        for name in COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def extend(self, conversations):
+        ''' Adds the attributes of the given Conversations '''
+        conversations = list(conversations)
+        end = self.size + len(conversations)
+
+        if end > len(self.turns):
+            self.__grow(end)
+
+        rows = slice(self.size, end)
+        self.participants[rows] = [c.unique_participants()
+                                   for c in conversations]
+        self.turns[rows] = [c.number_of_turns() for c in conversations]
+        self.sentiment[rows] = [SENTIMENTS.index(c.conversation_sentiment)
+                                for c in conversations]
+        # A single tweet has no differences, any threshold is fine then.
+        self.lowest_diff[rows] = [
+            c.lowest_sentiment_diff() if c.sentiment_diffs else np.inf
+            for c in conversations
+        ]
+
+        self.size = end
+        self.indexes = None
+
+    def build_indexes(self):
+        ''' Puts the rows in buckets for the range queries of 'filter'. The
+            rows are sorted by turns, participants, sentiment and lowest
+            difference, a bucket is a run of rows with the same turns,
+            participants and sentiment.
+        '''
+        turns = self.turns[:self.size]
+        participants = self.participants[:self.size]
+        sentiment = self.sentiment[:self.size]
+        lowest_diff = self.lowest_diff[:self.size]
+
+        # np.lexsort sorts by the last key first.
+        rows = np.lexsort((lowest_diff, sentiment, participants, turns))
+
+        keys = np.stack((turns[rows], participants[rows], sentiment[rows]))
+        new_bucket = np.ones(self.size, dtype=bool)
+        new_bucket[1:] = np.any(keys[:, 1:] != keys[:, :-1], axis=0)
+        starts = np.flatnonzero(new_bucket)
+
+        self.indexes = {
+            'rows': rows,
+            'lowest_diff': lowest_diff[rows],
+            'starts': starts,
+            'stops': np.append(starts[1:], self.size),
+            'turns': keys[0, starts],
+            'participants': keys[1, starts],
+            'sentiment': keys[2, starts],
+        }
+
+    def filter(self, min_part, max_part, min_turn, max_turn,
+               sentiment='All', threshold=0.0, start=0):
+        ''' Returns the rows of the conversations that pass the filter, in
+            the order they were added. 'All' allows every sentiment. Only
+            the rows from 'start' on are looked at.
+        '''
+        if self.indexes is None or self.size <= SCAN_SIZE or start > 0:
+            return self.__scan(min_part, max_part, min_turn, max_turn,
+                               sentiment, threshold, start)
+
+        index = self.indexes
+        buckets = ((index['turns'] >= min_turn) &
+                   (index['turns'] <= max_turn) &
+                   (index['participants'] >= min_part) &
+                   (index['participants'] <= max_part))
+
+        if sentiment != 'All':
+            buckets &= index['sentiment'] == SENTIMENTS.index(sentiment)
+
+        slices = []
+        for start, stop in zip(index['starts'][buckets],
+                               index['stops'][buckets]):
+            if threshold > 0:
+                start += np.searchsorted(index['lowest_diff'][start:stop],
+                                         threshold, 'left')
+
+            slices.append(index['rows'][start:stop])
+
+        if not slices:
+            return np.zeros(0, dtype=np.int64)
+
+        return np.sort(np.concatenate(slices))
+
+    def __scan(self, min_part, max_part, min_turn, max_turn, sentiment,
+               threshold, start=0):
+        ''' Returns the rows that pass the filter by looking at all rows
+            from 'start' on
+        '''
+        rows = slice(start, self.size)
+        participants = self.participants[rows]
+        turns = self.turns[rows]
+
+        mask = ((turns >= min_turn) & (turns <= max_turn) &
+                (participants >= min_part) & (participants <= max_part))
+
+        if sentiment != 'All':
+            mask &= self.sentiment[rows] == SENTIMENTS.index(sentiment)
+
+        if threshold > 0:
+            mask &= self.lowest_diff[rows] >= threshold
+
+        return np.flatnonzero(mask) + start
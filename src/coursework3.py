@@ -19,7 +19,7 @@ Usage:
 """
 
 import datetime
-import json
+import itertools
 import queue
 import textwrap
 import threading
@@ -27,29 +27,79 @@ import time
 import tkinter as tk
 import tkinter.filedialog as fd
 import tkinter.ttk as ttk
-from enum import Enum
-from os.path import isfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import cached_property, partial
 from tkinter import scrolledtext as st
 from tkinter.font import Font
 
+import numpy as np
 import tweepy
-from geopy import Nominatim
 from nltk import download
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
 
+from background_job import BackgroundJob
+from base_api import BaseApi
+from chain_resolver import ChainResolver
+from checkpoint import SessionCheckpoint
+from conversation_file import ConversationReader, ConversationWriter
+from conversation_store import ConversationStore
+from general_status import GeneralStatus
+from geocoding import Geocoder
+from id_set import IdSet
+from reply_stream import STREAM_URL, ReplyStream
+from scheduler import RequestScheduler, ThreadedApi
+from sentiment_cache import SentimentCache
+from sentiment_pool import SentimentPool, lexicon_version
+from search_cursor import SEARCH_COUNT
+from tweet_record import TweetRecord
+
 # Downloads the required nltk corpus if it is not installed already
 download('vader_lexicon')
 
+# Number of conversations scored at a time while loading a file.
+LOAD_CHUNK = 500
+
+# Seconds the gui spends per callback on adding loaded conversations to the
+# treeview, so it keeps drawing at about 60 frames per second.
+FRAME_TIME = 0.012
+
+# Milliseconds between two checks for loaded conversations.
+LOAD_POLL_INTERVAL = 20
+
+# Number of loaded conversations added to the treeview at a time.
+SHOW_CHUNK = 20
+
+# Milliseconds the filter settings have to stay the same before filtering.
+FILTER_DELAY = 150
+
 
 class Conversation:
     sid = SentimentIntensityAnalyzer()
 
-    def __init__(self, data):
+    def __init__(self, data, sentiment_scores=None):
         self.tweets = [tweet["text"] for tweet in data[::-1]]
         self.authors = [tweet["user"]["screen_name"] for tweet in data[::-1]]
-        self.sentiment_scores = self.__score_tweets()
-        self.sentiment_diffs = self.__sent_diffs()
-        self.conversation_sentiment = self.__conv_sent()
+
+        # The scores can be computed beforehand, e.g. by a SentimentPool,
+        # otherwise the tweets are scored the first time they are needed.
+        if sentiment_scores is not None:
+            self.sentiment_scores = sentiment_scores
+
+    @cached_property
+    def sentiment_scores(self):
+        ''' Sentiment scores of the tweets, computed once '''
+        return self.__score_tweets()
+
+    @cached_property
+    def sentiment_diffs(self):
+        ''' Differences between the sentiments of the turns, computed once '''
+        return self.__sent_diffs()
+
+    @cached_property
+    def conversation_sentiment(self):
+        ''' Sentiment of the conversation, computed once '''
+        return self.__conv_sent()
 
     def __score_tweets(self):
         ''' Returns list of sentiment score of individual tweets in
@@ -92,6 +142,55 @@ class Conversation:
         return min([abs(x) for x in self.sentiment_diffs])
 
 
+def conversation_texts(json_convos):
+    ''' Returns the texts of the tweets of the conversations, in the order
+        a Conversation keeps them
+    '''
+    return [tweet["text"] for cv in json_convos for tweet in cv[::-1]]
+
+
+def build_conversations(json_convos, scores):
+    ''' Creates the Conversations from the scores of 'conversation_texts' '''
+    conversations = []
+    start = 0
+
+    for cv in json_convos:
+        conversations.append(Conversation(cv, scores[start:start + len(cv)]))
+        start += len(cv)
+
+    return conversations
+
+
+def load_conversations(job, path, pool):
+    ''' Reads the conversations of a file in chunks and scores them on the
+        SentimentPool, this is the work of the BackgroundJob that loads a
+        file. Every conversation is scored here, the treeview and the
+        ConversationStore both need its sentiment. A few chunks are scored at
+        the same time to keep all worker processes busy, the results go out
+        in the order of the file.
+    '''
+    reader = ConversationReader(path)
+    json_convos = iter(reader)
+    scoring = deque()
+
+    while not job.cancelled():
+        chunk = list(itertools.islice(json_convos, LOAD_CHUNK))
+
+        if chunk:
+            texts = conversation_texts(chunk)
+            scoring.append((chunk, reader.progress(), pool.submit(texts)))
+
+        if not scoring:
+            return
+
+        if chunk and len(scoring) < 2 * pool.processes:
+            continue
+
+        chunk, progress, scores = scoring.popleft()
+        job.put(build_conversations(chunk, scores.result()))
+        job.progress = progress
+
+
 class ConversationTreeview(tk.Frame):
     def __init__(self, parent, *args, **kwargs):
         super().__init__(parent)
@@ -117,9 +216,9 @@ class ConversationTreeview(tk.Frame):
         self.tree.pack(side='left', fill='both', expand=True)
         self.scrollbar.pack(side='right', fill='y')
 
-    def __clear(self):
-        ''' Clears contents of treeview widget '''
-        self.tree.delete(*self.tree.get_children())
+        # The rows of the conversations that are shown, in order. The item
+        # of a conversation has its row as id.
+        self.shown = np.zeros(0, dtype=np.int64)
 
     def wrap_text(self, text):
         ''' Splits longer tweets into two lines '''
@@ -138,24 +237,53 @@ class ConversationTreeview(tk.Frame):
 
         return ' '.join(line1) + '\n' + ' '.join(line2)
 
-    def update(self, conversations):
-        ''' Clear treeview widget and add new conversations '''
-        self.__clear()
-
-        for convo in conversations:
-            root_tweet_text = self.wrap_text(convo.tweets[0])
-            root_tw = self.tree.insert('', 'end', text=root_tweet_text,
-                                       values=[convo.authors[0],
-                                               convo.conversation_sentiment])
-            for i in range(1, convo.number_of_turns()):
-                if convo.sentiment_diffs[i-1] <= 0:
-                    sent_diff = '+' + \
-                        str(round(abs(convo.sentiment_diffs[i-1]), 5))
-                else:
-                    sent_diff = '-' + str(round(convo.sentiment_diffs[i-1], 5))
-                tweet_text = self.wrap_text(convo.tweets[i])
-                self.tree.insert(root_tw, 'end', text=tweet_text,
-                                 values=[convo.authors[i], sent_diff])
+    def update(self, conversations, rows):
+        ''' Shows the conversations of the given (sorted) rows. Only the
+            conversations that are not shown yet are added and only the
+            ones that are not in the rows anymore are removed, the others
+            stay as they are.
+        '''
+        rows = np.asarray(rows, dtype=np.int64)
+
+        gone = np.setdiff1d(self.shown, rows, assume_unique=True)
+        if len(gone):
+            self.tree.delete(*gone.astype(str))
+
+        # Added in order, so every conversation goes in at its final place.
+        new = np.setdiff1d(rows, self.shown, assume_unique=True)
+        for row, index in zip(new.tolist(),
+                              np.searchsorted(rows, new).tolist()):
+            self.__insert(conversations[row], row, index)
+
+        self.shown = rows
+
+    def add(self, conversations, rows):
+        ''' Adds the conversations of the given rows below the ones that
+            are shown, the rows come after the shown ones
+        '''
+        rows = np.asarray(rows, dtype=np.int64)
+
+        for row in rows.tolist():
+            self.__insert(conversations[row], row, 'end')
+
+        self.shown = np.concatenate((self.shown, rows))
+
+    def __insert(self, convo, row, index):
+        ''' Inserts a conversation at the given index '''
+        root_tweet_text = self.wrap_text(convo.tweets[0])
+        root_tw = self.tree.insert('', index, iid=str(row),
+                                   text=root_tweet_text,
+                                   values=[convo.authors[0],
+                                           convo.conversation_sentiment])
+        for i in range(1, convo.number_of_turns()):
+            if convo.sentiment_diffs[i-1] <= 0:
+                sent_diff = '+' + \
+                    str(round(abs(convo.sentiment_diffs[i-1]), 5))
+            else:
+                sent_diff = '-' + str(round(convo.sentiment_diffs[i-1], 5))
+            tweet_text = self.wrap_text(convo.tweets[i])
+            self.tree.insert(root_tw, 'end', text=tweet_text,
+                             values=[convo.authors[i], sent_diff])
 
 
 class ConversationDisplay(tk.Frame):
@@ -163,33 +291,54 @@ class ConversationDisplay(tk.Frame):
         super().__init__(parent)
         self.conversations = []
 
+        # The attributes the filter looks at, by index in conversations.
+        self.store = ConversationStore()
+
+        # The file that is loading and the conversations it loaded that are
+        # not shown yet.
+        self.load_job = None
+        self.load_poll = None
+        self.pending = deque()
+
+        # Started on the first load, starting the processes takes a while.
+        self.sentiment_pool = None
+
+        # The filter that is waiting for the settings to stop changing and
+        # whether the conversations shown are filtered.
+        self.filter_job = None
+        self.filtered = False
+
         self.filter_menu = tk.Frame(self)
         self.view = ConversationTreeview(self)
 
         self.min_part_scale = tk.Scale(self.filter_menu, from_=2, to=10,
                                        label="Min participants:",
-                                       orient="horizontal")
+                                       orient="horizontal",
+                                       command=self.schedule_filter)
         self.min_part_scale.bind(
             "<ButtonRelease-1>", self.check_max_part_scale)
         self.min_part_scale.set(2)
 
         self.max_part_scale = tk.Scale(self.filter_menu, from_=2, to=10,
                                        label="Max participants:",
-                                       orient="horizontal")
+                                       orient="horizontal",
+                                       command=self.schedule_filter)
         self.max_part_scale.bind(
             "<ButtonRelease-1>", self.check_min_part_scale)
         self.max_part_scale.set(10)
 
         self.min_turn_scale = tk.Scale(self.filter_menu, from_=3, to=10,
                                        label="Min length:",
-                                       orient="horizontal")
+                                       orient="horizontal",
+                                       command=self.schedule_filter)
         self.min_turn_scale.bind(
             "<ButtonRelease-1>", self.check_max_turn_scale)
         self.min_turn_scale.set(2)
 
         self.max_turn_scale = tk.Scale(self.filter_menu, from_=3, to=10,
                                        label="Max length:",
-                                       orient="horizontal")
+                                       orient="horizontal",
+                                       command=self.schedule_filter)
         self.max_turn_scale.bind(
             "<ButtonRelease-1>", self.check_min_turn_scale)
         self.max_turn_scale.set(10)
@@ -200,6 +349,7 @@ class ConversationDisplay(tk.Frame):
         self.option_list = ["All", "Positive", "Negative", "Neutral"]
         self.sent_change_var = tk.StringVar()
         self.sent_change_var.set(self.option_list[0])
+        self.sent_change_var.trace_add("write", self.schedule_filter)
         self.sent_change_opt = tk.OptionMenu(self.filter_menu,
                                              self.sent_change_var,
                                              *self.option_list)
@@ -207,12 +357,22 @@ class ConversationDisplay(tk.Frame):
         self.sent_thresh_scale = tk.Scale(self.filter_menu, from_=0, to=0.5,
                                           label="Sentiment change threshold:",
                                           orient="horizontal",
-                                          resolution=0.01)
+                                          resolution=0.01,
+                                          command=self.schedule_filter)
         self.sent_thresh_scale.set(0)
 
         self.filter_button = tk.Button(self.filter_menu, text="Filter",
                                        command=self.filter, width=22)
 
+        self.load_label = tk.Label(self.filter_menu, anchor="w", padx="7",
+                                   justify="left")
+        self.load_progress = ttk.Progressbar(self.filter_menu,
+                                             orient="horizontal",
+                                             maximum=1.0)
+        self.cancel_button = tk.Button(self.filter_menu, text="Cancel loading",
+                                       command=self.cancel_loading,
+                                       state="disabled")
+
         self.min_part_scale.pack(fill='x')
         self.max_part_scale.pack(fill='x')
         self.min_turn_scale.pack(fill='x')
@@ -221,41 +381,122 @@ class ConversationDisplay(tk.Frame):
         self.sent_change_opt.pack(fill='x')
         self.sent_thresh_scale.pack(fill='x')
         self.filter_button.pack(fill='x')
+        self.load_label.pack(fill='x')
+        self.load_progress.pack(fill='x', padx="7")
+        self.cancel_button.pack(fill='x')
 
         self.filter_menu.pack(side='left', fill='both')
         self.view.pack(side='right', fill='both', expand=True)
 
-    def __filter_conditions(self, convo):
-        ''' Checks conditions for filter function and returns boolean
-            of result
-        '''
-        min_part = convo.unique_participants() >= self.min_part_scale.get()
-        max_part = convo.unique_participants() <= self.max_part_scale.get()
-        min_turn = convo.number_of_turns() >= self.min_turn_scale.get()
-        max_turn = convo.number_of_turns() <= self.max_turn_scale.get()
-        s_change = (self.sent_change_var.get() == "All" or
-                    self.sent_change_var.get() == convo.conversation_sentiment)
-        s_thr = convo.lowest_sentiment_diff() >= self.sent_thresh_scale.get()
-
-        return (min_part and max_part and min_turn and
-                max_turn and s_change and s_thr)
-
     def load_file(self):
         ''' Loads conversations from file and updates treeview '''
         path = fd.askopenfilename(parent=self,
-                                  filetypes=(("JSON files", "*.json"),))
+                                  filetypes=(("Conversation files",
+                                              "*.json *.jsonl"),))
         if not path:
             return
 
-        with open(path) as f:
-            try:
-                json_convos = json.load(f)["conversations"]
-                self.conversations = [Conversation(cv) for cv in json_convos]
-                self.view.update(self.conversations)
-            except Exception:
-                tk.messagebox.showerror("Error", "Invalid conversation file." +
-                                        " Please try a different document.")
-                self.load_file()
+        self.__stop_loading()
+        self.conversations = []
+        self.store.clear()
+        self.view.update(self.conversations, [])
+        self.filtered = False
+
+        # Both the json files and the json lines files of the Feed work. The
+        # file is read and scored on a worker thread, the conversations are
+        # added to the treeview a frame's worth at a time.
+        if not self.sentiment_pool:
+            self.sentiment_pool = SentimentPool(cache=SentimentCache(
+                'sentiment_cache.db', lexicon_version()
+            ))
+
+        self.load_job = BackgroundJob(load_conversations, path,
+                                      self.sentiment_pool)
+        self.load_job.start()
+        self.cancel_button.configure(state="normal")
+        self.__poll_load_job()
+
+    def __poll_load_job(self):
+        ''' Shows the conversations loaded so far and the progress '''
+        job = self.load_job
+
+        for chunk in job.take():
+            self.pending.extend(chunk)
+
+        start = time.perf_counter()
+        while self.pending and time.perf_counter() - start < FRAME_TIME:
+            first = len(self.conversations)
+            added = [self.pending.popleft()
+                     for _ in range(min(SHOW_CHUNK, len(self.pending)))]
+
+            self.conversations.extend(added)
+            self.store.extend(added)
+
+            # Once filtered, only the new conversations that pass are shown.
+            if self.filtered:
+                rows = self.store.filter(*self.__filter_settings(),
+                                         start=first)
+            else:
+                rows = range(first, len(self.conversations))
+
+            self.view.add(self.conversations, rows)
+
+        if job.error:
+            self.__stop_loading()
+            self.conversations = []
+            self.store.clear()
+            self.view.update(self.conversations, [])
+            self.load_label.configure(text="")
+            tk.messagebox.showerror("Error", "Invalid conversation file." +
+                                    " Please try a different document.")
+            self.load_file()
+            return
+
+        self.load_progress['value'] = job.progress
+
+        if job.is_done() and not self.pending:
+            self.__stop_loading()
+            hit_rate = self.sentiment_pool.cache.hit_rate()
+            self.load_label.configure(
+                text=f"Loaded {len(self.conversations)} conversations\n"
+                     f"{hit_rate:.0%} of the scores from the cache")
+            return
+
+        self.load_label.configure(
+            text=f"Loading... {len(self.conversations)} conversations")
+        self.load_poll = self.after(LOAD_POLL_INTERVAL, self.__poll_load_job)
+
+    def __stop_loading(self):
+        ''' Stops loading the file, the conversations shown so far stay '''
+        if self.load_job:
+            self.load_job.cancel()
+            self.load_job = None
+
+        if self.load_poll:
+            self.after_cancel(self.load_poll)
+            self.load_poll = None
+
+        self.pending.clear()
+        self.store.build_indexes()
+        self.load_progress['value'] = 0
+        self.cancel_button.configure(state="disabled")
+
+    def cancel_loading(self):
+        ''' Cancels loading the file that is loading, if any '''
+        if not self.load_job:
+            return
+
+        self.__stop_loading()
+        self.load_label.configure(
+            text=f"Cancelled, {len(self.conversations)} conversations loaded")
+
+    def clean_up(self):
+        ''' Stops loading and stops the scoring processes '''
+        self.cancel_loading()
+
+        if self.sentiment_pool:
+            self.sentiment_pool.close()
+            self.sentiment_pool = None
 
     def check_max_part_scale(self, event):
         ''' Checks if max participant slider is lower than min participant
@@ -285,150 +526,85 @@ class ConversationDisplay(tk.Frame):
         if self.min_turn_scale.get() > self.max_turn_scale.get():
             self.min_turn_scale.set(self.max_turn_scale.get())
 
-    def filter(self):
-        ''' Returns conversations according to filter settings '''
-        filtered_convos = []
-        for convo in self.conversations:
-            if self.__filter_conditions(convo):
-                filtered_convos.append(convo)
-
-        self.view.update(filtered_convos)
+    def __filter_settings(self):
+        ''' Returns the filter settings, in the order of the arguments of
+            ConversationStore.filter
+        '''
+        return (self.min_part_scale.get(),
+                self.max_part_scale.get(),
+                self.min_turn_scale.get(),
+                self.max_turn_scale.get(),
+                self.sent_change_var.get(),
+                self.sent_thresh_scale.get())
+
+    def schedule_filter(self, *args):
+        ''' Filters once the settings stopped changing for a moment, called
+            whenever a slider moves or the sentiment changes
+        '''
+        if not self.conversations:
+            return
 
+        if self.filter_job:
+            self.after_cancel(self.filter_job)
 
-class GeneralStatus(Enum):
-    ''' Enum used for indicating a status '''
-    IDLE = 'idle'
-    FETCHING = 'fetching'
-    RETRYING = 'retrying'
-    PARSING = 'parsing'
-    ERROR = 'error'
+        self.filter_job = self.after(FILTER_DELAY, self.filter)
 
+    def filter(self):
+        ''' Shows the conversations according to filter settings '''
+        if self.filter_job:
+            self.after_cancel(self.filter_job)
+            self.filter_job = None
+
+        self.filtered = True
+        rows = self.store.filter(*self.__filter_settings())
+
+        self.view.update(self.conversations, rows)
+
+
+class TweepyApi(BaseApi):
+    def __init__(self, credentials_path='credentials.txt',
+                 cache_path='status_cache.db',
+                 search_state_path='search_state.json',
+                 stream_url=STREAM_URL, backend=None):
+        super().__init__(cache_path, search_state_path)
+
+        # All calls to the Twitter api go through this scheduler, which keeps
+        # track of the rate limit of every endpoint, see scheduler.py.
+        self.scheduler = RequestScheduler(self.__last_response_headers,
+                                          self.__on_rate_limit_wait,
+                                          lambda: self.halt)
+
+        # Resolves the reply chains of all candidates in a search page at
+        # once, see chain_resolver.py for more information.
+        self.resolver = ChainResolver(self.__lookup_statuses,
+                                      self.max_conv_len,
+                                      lambda: self.halt,
+                                      self.status_cache,
+                                      keep_user=self.keep_full_user)
+
+        # Number of search pages of which the chains are resolved at the same
+        # time, 1 means 'get_conversation' is used one call at a time.
+        self.workers = 4
+
+        # Endpoint used by 'stream_conversations', can point to the stand-in
+        # server of fake_twitter.py.
+        self.stream_url = stream_url
 
-class TweepyApi:
-    def __init__(self, credentials_path='credentials.txt'):
-        self.status = GeneralStatus.IDLE
-        self.message = ''
+        # --
+        #   Object with the same calls as tweepy.API to use instead of the
+        #   real api, for example the ReplayApi of replay_api.py. No
+        #   credentials are needed in that case.
+        # --
+        self.api = backend
 
-        self.seen_tweet_ids = set()
-        self.halt = False
-
-        # Adapted from:
-        # https://developer.twitter.com/en/docs/ \
-        # twitter-for-websites/supported-languages
-        self.available_languages = {
-            'English':                  'en',
-            'Arabic':                   'ar',
-            'Bengali':                  'bn',
-            'Czech':                    'cs',
-            'Danish':                   'da',
-            'German':                   'de',
-            'Greek':                    'el',
-            'Spanish':                  'es',
-            'Persian':                  'fa',
-            'Finnish':                  'fi',
-            'Filipino':                 'fil',
-            'French':                   'fr',
-            'Hebrew':                   'he',
-            'Hindi':                    'hi',
-            'Hungarian':                'hu',
-            'Indonesian':               'id',
-            'Italian':                  'it',
-            'Japanese':                 'ja',
-            'Korean':                   'ko',
-            'Malay':                    'msa',
-            'Dutch':                    'nl',
-            'Norwegian':                'no',
-            'Polish':                   'pl',
-            'Portuguese':               'pt',
-            'Romanian':                 'ro',
-            'Russian':                  'ru',
-            'Swedish':                  'sv',
-            'Thai':                     'th',
-            'Turkish':                  'tr',
-            'Ukrainian':                'uk',
-            'Urdu':                     'ur',
-            'Vietnamese':               'vi',
-            'Chinese (Simplified)':     'zh-cn',
-            'Chinese (Traditional)':    'zh-tw',
-        }
-
-        self.default_language = 'English'
-        self.min_conv_len = 3
-        self.max_conv_len = 10
-
-        # These are the fields that get extracted from the individual tweets
-        # based on their keys.
-        self.wanted_keys = {
-            "created_at",
-            "id",
-            "text",
-            "in_reply_to_user_id",
-            "in_reply_to_status_id",
-            "in_reply_to_screen_name",
-            "user",
-        }
-
-        self.credentials = self.__read_in_credentials(credentials_path)
-        self.api = None
+        if not backend:
+            self.credentials = self.read_in_credentials(credentials_path)
 
         # This happens when someone does not have a valid credentials.txt file
         # in their root directory of the program.
         if self.credentials:
             self.api = self.__create_api()
 
-    def set_status(self, status):
-        ''' Sets the status of the api '''
-        print(f'New status api: {status}')
-        self.status = status
-
-    def set_message(self, message):
-        ''' Sets an message message '''
-        print(f'New message api: {message}')
-        self.message = message
-
-    def get_status(self):
-        ''' Returns the status of the api '''
-        return self.status.value
-
-    def get_message(self):
-        ''' Returns the latest message of the api '''
-        return self.message
-
-    def __read_in_credentials(self, path):
-        ''' Reads in twitter api credentials from the given path '''
-        if not isfile(path):
-            self.set_status(GeneralStatus.ERROR)
-            self.set_message('Path to credentials file does not exist.')
-
-            return None
-
-        with open(path, 'r') as f:
-            credentials = {}
-            for line in f.readlines():
-                # Bit ugly, be we have no idea what files the user provides.
-                if '=' in line:
-                    items = line.strip().split('=')
-                    if len(items) == 2:
-                        credentials[items[0]] = items[1]
-
-        required_keys = {'API_KEY', 'API_SECRET',
-                         'ACCESS_TOKEN', 'ACCESS_SECRET'}
-
-        if required_keys != credentials.keys():
-            self.set_status(GeneralStatus.ERROR)
-            self.set_message(
-                'Not all keys are given or the credentials format is wrong.'
-            )
-
-            return None
-
-        return credentials
-
-    def is_busy(self):
-        ''' Indicates if the api is busy '''
-        return (self.status != GeneralStatus.IDLE and
-                self.status != GeneralStatus.ERROR)
-
     def __create_api(self):
         ''' Creates a tweepy api instance '''
         auth = tweepy.OAuthHandler(
@@ -441,42 +617,98 @@ class TweepyApi:
             self.credentials['ACCESS_SECRET']
         )
 
-        return tweepy.API(auth)
+        # The fetching threads share the api, see scheduler.py.
+        return ThreadedApi(auth)
+
+    def __last_response_headers(self):
+        ''' Returns the headers of the latest response of the api to the
+            calling thread
+        '''
+        response = getattr(self.api, 'last_response', None)
+        return response.headers if response is not None else None
+
+    def __on_rate_limit_wait(self, endpoint, delay):
+        ''' Lets the user know we are waiting for the rate limit '''
+        self.set_status(GeneralStatus.RETRYING)
+        self.set_message((
+            f'Rate limit of {endpoint} reached, '
+            f'waiting {delay:.0f} seconds...'
+        ))
+
+    def __lookup_statuses(self, ids):
+        ''' Looks up multiple tweets at once using their ids '''
+        statuses = self.scheduler.call('statuses/lookup',
+                                       self.api.statuses_lookup,
+                                       ids)
 
-    def __extract_converstation(self, response, acc=None):
-        ''' Recursively extracts a conversation '''
-        if not acc:
-            acc = []
+        return [status._json for status in statuses or []]
 
+    def __extract_conversations(self, responses):
+        ''' Extracts the conversations of multiple reply tweets at once.
+            Candidates that were rejected before are skipped. Returns a list
+            of (candidate id, conversation) tuples.
+        '''
         if self.halt:
             return []
 
+        responses = [
+            response
+            for response in responses
+            if not self.rejections.is_rejected(response['id'],
+                                               self.min_conv_len,
+                                               self.max_conv_len)
+        ]
+
         self.set_status(GeneralStatus.PARSING)
 
-        cleaned_item = {
-            key: val
-            for key, val in response.items()
-            if key in self.wanted_keys
-        }
+        # The settings can change between searches.
+        self.resolver.max_conv_len = self.max_conv_len
+        self.resolver.keep_user = self.keep_full_user
 
-        acc.append(cleaned_item)
+        conversations = self.resolver.resolve(responses)
 
-        try:
-            new = self.api.get_status(
-                id=cleaned_item['in_reply_to_status_id']
-            )._json
-        except (tweepy.error.TweepError, tweepy.error.RateLimitError) as err:
-            self.set_status(GeneralStatus.ERROR)
-            self.set_message(f'Tweepy error, {err}')
+        # Halted conversations are empty, but they are not broken.
+        if self.halt:
             return []
 
-        # Exit condition is the main 'parent' of the initial tweet or the max
-        # number of turns per conversation.
-        if not new['in_reply_to_status_id'] or len(acc) == self.max_conv_len:
-            self.set_status(GeneralStatus.IDLE)
-            return acc
+        return [(r['id'], c) for r, c in zip(responses, conversations)]
 
-        return self.__extract_converstation(new, acc)
+    def __search_candidates(self, query, language, geocode):
+        ''' Searches for possible conversation candidates, yields a list of
+            reply tweets for every page of search results, together with a
+            function that saves the search position after the page. Continues
+            where the previous search with the same parameters stopped, so
+            only tweets that were not looked at before are returned.
+        '''
+        cursor = self.search_cursors.cursor(query, language, geocode)
+
+        while True:
+            params = cursor.next_params()
+
+            if not params:
+                return
+
+            page = self.scheduler.call(
+                'search',
+                self.api.search,
+                q=query,
+                lang=self.available_languages[language],
+                geocode=geocode,
+                count=SEARCH_COUNT,
+                **params
+            )
+
+            # Halted while waiting for the rate limit.
+            if page is None:
+                return
+
+            position = cursor.advance([status.id for status in page])
+
+            yield [
+                status._json
+                for status in page
+                if status._json['in_reply_to_status_id']
+            ], partial(cursor.commit, position)
 
     def get_conversation(self, query=None, language=None, geocode=None):
         ''' Gets a conversation, optionally filtered using the given
@@ -501,80 +733,254 @@ class TweepyApi:
             '''
         )
 
+        # Conversations left over from an earlier search page are only valid
+        # for the same search parameters.
+        if (query, language, geocode) != self.buffer_key:
+            self.clear_buffer()
+            self.buffer_key = (query, language, geocode)
+
         # This is not a very nice try-except, but the Tweepy package can throw
-        # an exception at strange places. For example, initializing the cursor
-        # might throw an exception, but not always, calling items() could also
-        # do it, and even accessing the _json. The exceptions are all from
-        # Tweepy and most of the time they are 400 status errors.
+        # an exception at strange places. For example, searching might throw
+        # an exception, but not always, looking up the parents could also do
+        # it, and even accessing the _json. The exceptions are all from Tweepy
+        # and most of the time they are 400 status errors. Rate limit errors
+        # are handled by the scheduler.
         try:
-            cursor = tweepy.Cursor(
-                self.api.search,
-                q=query,
-                lang=self.available_languages[language],
-                geocode=geocode
-            )
-
-            for status in cursor.items():
-                response = status._json
-
-                # Search for a possible conversation candidate.
-                if not response['in_reply_to_status_id']:
-                    continue
-
-                # Once we have a single conversation, we can extract it and
-                # stop searching.
-                conversation = self.__extract_converstation(response)
-                conversation_len = len(conversation)
-
-                # We only want to find conversations with 3-10 turns, as per
-                # the assignment instructions. We cannot specify this in
-                # calling the Twitter api, so we just have to try again if we
-                # do not find it here.
-                if (conversation_len >= self.min_conv_len and
-                        conversation_len <= self.max_conv_len):
-
-                    ids = {i['id'] for i in conversation}
-
-                    if ids.issubset(self.seen_tweet_ids):
-                        self.set_status(GeneralStatus.RETRYING)
-                        self.set_message(
-                            'Found already existing tweets, trying again...'
-                        )
-                        continue
-                    else:
-                        self.seen_tweet_ids.update(ids)
+            if not self.conversation_buffer:
+                for candidates, commit in self.__search_candidates(query,
+                                                                   language,
+                                                                   geocode):
+                    # The chains of all candidates in this page get resolved
+                    # at once.
+                    for candidate_id, conversation in \
+                            self.__extract_conversations(candidates):
+                        if self.halt:
+                            break
+
+                        self.accept_conversation(candidate_id, conversation)
+
+                    self.rejections.flush()
+
+                    # The position is not saved for a page that was halted
+                    # halfway, so the next search looks at it again.
+                    if self.halt:
                         break
 
-                if self.halt:
-                    break
+                    # Once we have a conversation, we can stop searching. The
+                    # page is done once its conversations are handed out.
+                    if self.conversation_buffer:
+                        self.buffer_commit = commit
+                        break
 
-                self.set_status(GeneralStatus.RETRYING)
-                self.set_message((
-                    f'Conversation with length {conversation_len}, '
-                    'trying again...'
-                ))
+                    commit()
 
         except (tweepy.error.TweepError, tweepy.error.RateLimitError) as err:
             self.set_status(GeneralStatus.ERROR)
             self.set_message(f'Tweepy error, {err}')
             return []
 
-        if not conversation:
+        if not self.conversation_buffer:
             self.set_status(GeneralStatus.ERROR)
             self.set_message('No results found or stopped fetching!')
             return []
 
+        conversation = self.conversation_buffer.popleft()
+
+        if not self.conversation_buffer:
+            self.commit_buffer()
+
         self.set_status(GeneralStatus.IDLE)
-        self.set_message(
-            f'Added new conversation with {len(conversation)} entries'
-        )
+        self.set_message((
+            f'Added new conversation with {len(conversation)} entries '
+            f'(cache hit rate {self.status_cache.hit_rate():.0%}, '
+            f'{self.seen_tweet_ids.summary()})'
+        ))
         return conversation
 
+    def __hand_out(self, conversations, callback):
+        ''' Passes the wanted conversations and the leftovers in the buffer
+            on to the callback. Returns False when halted before all of them
+            were handed out.
+        '''
+        for candidate_id, conversation in conversations:
+            if self.halt:
+                return False
+
+            self.accept_conversation(candidate_id, conversation)
+
+        self.rejections.flush()
+
+        while self.conversation_buffer:
+            if self.halt:
+                return False
+
+            conversation = self.conversation_buffer.popleft()
+            self.set_message((
+                f'Added new conversation with {len(conversation)} entries '
+                f'({self.seen_tweet_ids.summary()})'
+            ))
+            callback(conversation)
+
+        # Conversations of a halted page are not all there.
+        if self.halt:
+            return False
+
+        self.commit_buffer()
+        return True
+
+    def fetch_conversations(self, query=None, language=None, geocode=None,
+                            callback=None):
+        ''' Keeps fetching conversations until halted or until the search
+            results run out. The chains of the candidates in every search page
+            are resolved by a pool of workers, so the chains of several pages
+            are walked at the same time while the next page is searched. Each
+            accepted conversation gets passed to the callback as soon as its
+            page is done, in order of arrival. Uses the same parameters as
+            'get_conversation'.
+        '''
+        self.set_status(GeneralStatus.FETCHING)
+
+        if not language:
+            language = self.default_language
+
+        if (query, language, geocode) != self.buffer_key:
+            self.clear_buffer()
+            self.buffer_key = (query, language, geocode)
+
+        # The pages in search order with the function that saves the search
+        # position after them, and the pages that were handed out.
+        pages = deque()
+        handed_out = set()
+
+        def hand_out(done):
+            ''' Passes the wanted conversations of the finished pages on to
+                the callback. The search position is saved up to the first
+                page that is not handed out yet, so a halt never skips pages.
+            '''
+            for future in done:
+                if self.__hand_out(future.result(), callback):
+                    handed_out.add(future)
+
+            while pages and pages[0][0] in handed_out:
+                future, commit = pages.popleft()
+                handed_out.remove(future)
+                commit()
+
+        # Leftovers from an earlier 'get_conversation' call go first.
+        self.__hand_out([], callback)
+
+        # See 'get_conversation' on why this try-except is this broad.
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                pending = set()
+
+                for candidates, commit in self.__search_candidates(query,
+                                                                   language,
+                                                                   geocode):
+                    if self.halt:
+                        break
+
+                    # Splitting up a page would mean more lookup calls, so
+                    # every worker resolves the chains of a whole page.
+                    future = pool.submit(self.__extract_conversations,
+                                         candidates)
+                    pending.add(future)
+                    pages.append((future, commit))
+
+                    # Only fetch the next search page once there is room for
+                    # more work, this keeps the number of requests in flight
+                    # bounded.
+                    while len(pending) >= self.workers:
+                        done, pending = wait(pending,
+                                             return_when=FIRST_COMPLETED)
+                        hand_out(done)
+
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    hand_out(done)
+
+        except (tweepy.error.TweepError, tweepy.error.RateLimitError) as err:
+            self.set_status(GeneralStatus.ERROR)
+            self.set_message(f'Tweepy error, {err}')
+            return
+
+        self.set_status(GeneralStatus.IDLE)
+
+    def stream_conversations(self, query=None, language=None, geocode=None,
+                             callback=None, batch_size=20, batch_wait=1.0):
+        ''' Keeps a filtered stream of new replies open until halted and
+            passes the accepted conversations to the callback. Replies are
+            resolved in batches, to share the lookup calls, but a batch never
+            waits longer than batch_wait seconds for more replies. Uses the
+            same parameters as 'get_conversation'.
+        '''
+        self.set_status(GeneralStatus.FETCHING)
+
+        if not language:
+            language = self.default_language
+
+        if not self.api:
+            self.set_status(GeneralStatus.ERROR)
+            self.set_message('No valid credentials, cannot open the stream.')
+            return
+
+        stream = ReplyStream(self.api.auth.apply_auth(),
+                             query,
+                             self.available_languages[language],
+                             geocode,
+                             self.stream_url,
+                             lambda: self.halt)
+
+        if not stream.terms and not stream.box:
+            self.set_status(GeneralStatus.ERROR)
+            self.set_message('Streaming needs search terms or a location.')
+            return
+
+        replies = queue.Queue()
+        stream.start(replies.put)
+
+        self.set_message('Waiting for new replies...')
+
+        batch = []
+        deadline = None
+
+        # See 'get_conversation' on why this try-except is this broad.
+        try:
+            while not self.halt and not stream.error:
+                try:
+                    batch.append(replies.get(timeout=0.1))
+                    deadline = deadline or time.time() + batch_wait
+                except queue.Empty:
+                    pass
+
+                if batch and (len(batch) >= batch_size or
+                              time.time() >= deadline):
+                    self.__hand_out(self.__extract_conversations(batch),
+                                    callback)
+                    self.set_status(GeneralStatus.FETCHING)
+                    batch = []
+                    deadline = None
+
+        except (tweepy.error.TweepError, tweepy.error.RateLimitError) as err:
+            self.set_status(GeneralStatus.ERROR)
+            self.set_message(f'Tweepy error, {err}')
+            return
+
+        finally:
+            stream.close()
+
+        if stream.error:
+            self.set_status(GeneralStatus.ERROR)
+            self.set_message(stream.error)
+            return
+
+        self.set_status(GeneralStatus.IDLE)
+
     def change_credentials(self, filepath):
         ''' Changes the Twitter api credentials with a credentials file from
             the given path.
         '''
-        credentials = self.__read_in_credentials(filepath)
+        credentials = self.read_in_credentials(filepath)
 
         if credentials:
             self.credentials = credentials
@@ -669,12 +1075,15 @@ class EditableList(tk.Frame):
 
 
 class Feed(tk.Frame):
-    def __init__(self, parent, *args, **kwargs):
+    def __init__(self, parent, api=None, geocoder=None, *args, **kwargs):
         super().__init__(parent)
         self.clean_up_parent = parent.destroy
 
-        # -- Api for retrieving conversations --
-        self.api = TweepyApi()
+        # --
+        #   Api for retrieving conversations, the TweepyApi unless another
+        #   backend is given, for example the AsyncTweepyApi.
+        # --
+        self.api = api if api else TweepyApi()
 
         # -- Status indicator if the frame is busy --
         self.status = GeneralStatus.IDLE
@@ -697,6 +1106,17 @@ class Feed(tk.Frame):
         # --
         self.conversation_list = []
 
+        # --
+        #   Once saved, new conversations of the session are appended to the
+        #   save file by this writer as they come in. The lock keeps the
+        #   conversation list and the file in step.
+        # --
+        self.writer = None
+        self.save_lock = threading.Lock()
+
+        # -- Checkpoints of the running session, see checkpoint.py --
+        self.checkpoint = SessionCheckpoint('session')
+
         # -- List of search terms --
         self.search_terms_list = EditableList(self, 'Search terms')
 
@@ -712,7 +1132,25 @@ class Feed(tk.Frame):
         # -- Location entry fields --
         self.location_entry = tk.Entry(self)
         self.radius_entry = tk.Entry(self)
-        self.geocoder = Nominatim(user_agent='hci_final_project')
+
+        # --
+        #   Turns the address into coordinates. Lookups start in the
+        #   background as soon as the address field loses focus and are
+        #   remembered between sessions.
+        # --
+        self.geocoder = (geocoder if geocoder
+                         else Geocoder('geocode_cache.json'))
+        self.location_entry.bind('<FocusOut>', self.__prefetch_location)
+
+        # -- Listen to new replies instead of searching --
+        self.streaming = tk.BooleanVar(self)
+        self.streaming_check = tk.Checkbutton(self,
+                                              text='Stream new replies',
+                                              variable=self.streaming)
+
+        # Not every api has a stream.
+        if not hasattr(self.api, 'stream_conversations'):
+            self.streaming_check['state'] = tk.DISABLED
 
         # -- Start fetching using the current filters to get conversation --
         self.start_stop_button = tk.Button(self,
@@ -757,6 +1195,7 @@ class Feed(tk.Frame):
         langauge_label.grid(row=2, column=0, sticky='w')
         location_label.grid(row=3, column=0, sticky='w')
         radius_label.grid(row=4, column=0, sticky='w')
+        self.streaming_check.grid(row=5, column=0, sticky='w')
         self.start_stop_button.grid(row=5, column=1, sticky='nsew')
 
         scroll.grid(row=0, column=2, rowspan=6, sticky='ens')
@@ -787,9 +1226,14 @@ class Feed(tk.Frame):
             f'\nWindow message: {self.st_textwrapper(self.get_message())}'
         ))
 
+        # The writer saves on its own thread, a failed write shows up here.
+        if self.writer and self.writer.error:
+            self.__close_writer()
+
         if (self.api.status == GeneralStatus.ERROR or
                 self.status == GeneralStatus.ERROR):
             self.paused = True
+            self.api.halt = True
             self.start_stop_button['text'] = 'Start fetching'
 
         self.after(100, self.poll_system_status)
@@ -810,8 +1254,12 @@ class Feed(tk.Frame):
             self.start_stop_button['text'] = 'Stop fetching'
 
             self.tree.delete(*self.tree.get_children())
+            self.__close_writer()
             self.conversation_list = []
-            self.api.seen_tweet_ids = set()
+            self.api.seen_tweet_ids.clear()
+            self.api.conversation_heads.clear()
+            self.api.rejections.new_session()
+            self.api.clear_buffer()
             self.tweet_queue.queue.clear()
 
             threading.Thread(target=self.__submit).start()
@@ -843,6 +1291,15 @@ class Feed(tk.Frame):
         return (self.status != GeneralStatus.IDLE and
                 self.status != GeneralStatus.ERROR)
 
+    def __prefetch_location(self, event):
+        ''' Starts resolving the typed in address in the background, so it
+            is most likely known by the time fetching starts.
+        '''
+        location_query = self.location_entry.get()
+
+        if location_query.strip():
+            self.geocoder.submit(location_query)
+
     def __submit(self):
         ''' Submits the current filters and asks the api to start retrieving
             conversations. The filters get validated before sending the request
@@ -852,6 +1309,9 @@ class Feed(tk.Frame):
 
         location_query = self.location_entry.get()
 
+        # The lookup runs while the other filters get prepared.
+        geo_future = self.geocoder.submit(location_query)
+
         # Clean the radius of any non numeric characters and set it back. This
         # is somewhat tolerant for someone typing '20km' by accident for
         # example as it would normalize it to '20' instead of giving an error.
@@ -861,17 +1321,6 @@ class Feed(tk.Frame):
         self.radius_entry.delete(0, tk.END)
         self.radius_entry.insert(0, location_radius)
 
-        geo_query = None
-
-        if location_query and location_radius:
-            geo = self.geocoder.geocode(location_query)
-            if geo:
-                geo_query = (
-                    f'{geo.latitude},{geo.longitude},{location_radius}km'
-                )
-            else:
-                self.location_entry.delete(0, tk.END)
-
         language = self.language.get()
 
         search_terms = self.search_terms_list.get_entries()
@@ -883,30 +1332,163 @@ class Feed(tk.Frame):
         else:
             search_query = '*'
 
+        geo_query = None
+
+        if location_query and location_radius:
+            geo = geo_future.result()
+            if geo:
+                latitude, longitude = geo
+                geo_query = f'{latitude},{longitude},{location_radius}km'
+            else:
+                self.location_entry.delete(0, tk.END)
+
         self.start_fetching(search_query, language, geo_query)
 
-    def start_fetching(self, search_query, language, geo_query):
-        ''' Continuosly fetches conversations when the system is not paused '''
-        while not self.paused:
-            result = self.api.get_conversation(search_query,
-                                               language,
-                                               geo_query)
+    def start_fetching(self, search_query, language, geo_query,
+                       resume=False):
+        ''' Continuosly fetches conversations when the system is not paused.
+            The session is checkpointed while fetching, resume continues the
+            checkpoint of the previous session.
+        '''
+        safe = search_query if search_query and search_query != "*" else ""
 
-            safe = search_query if search_query and search_query != "*" else ""
+        formatted_query = (
+            f'{language}'
+            f'{"&" + safe}'
+            f'{"&" + geo_query if geo_query else ""}'
+        )
 
-            if result:
-                formatted_query = (
-                    f'{language}'
-                    f'{"&" + safe}'
-                    f'{"&" + geo_query if geo_query else ""}'
-                )
+        search_key = self.api.search_cursors.key(search_query,
+                                                 language,
+                                                 geo_query)
+
+        self.checkpoint.begin(
+            {
+                'query': search_query,
+                'language': language,
+                'geocode': geo_query,
+                'formatted_query': formatted_query,
+            },
+            self.api.seen_tweet_ids,
+            lambda: self.api.search_cursors.states.get(search_key),
+            resume
+        )
+
+        def add_conversation(result):
+            ''' Stores a conversation and queues it for the treeview and
+                the save file.
+            '''
+            with self.save_lock:
                 self.conversation_list.append((result, formatted_query))
-                self.tweet_queue.put(result)
+
+                if self.writer:
+                    self.writer.write(result)
+
+            self.checkpoint.add(result)
+            self.tweet_queue.put(result)
+
+        while not self.paused:
+            # The stream stays open until stopped or until it fails, so
+            # there is no need to go around again.
+            if self.streaming.get():
+                self.api.stream_conversations(search_query,
+                                              language,
+                                              geo_query,
+                                              add_conversation)
+                break
+
+            # With multiple workers, conversations get added as soon as their
+            # chain is done instead of one conversation per call.
+            if self.api.workers > 1:
+                self.api.fetch_conversations(search_query,
+                                             language,
+                                             geo_query,
+                                             add_conversation)
+            else:
+                result = self.api.get_conversation(search_query,
+                                                   language,
+                                                   geo_query)
+                if result:
+                    add_conversation(result)
 
             time.sleep(0.1)
 
+        self.checkpoint.end()
         self.set_status(GeneralStatus.IDLE)
 
+    def resume_session(self):
+        ''' Restores the conversations, seen tweets and search position of
+            the last checkpointed session and continues fetching where it
+            stopped.
+        '''
+        if not self.api:
+            self.set_status(GeneralStatus.ERROR)
+            self.set_message('No credentials file provided, please add one.')
+            return
+
+        if not self.paused:
+            self.set_message('Stop fetching before resuming a session.')
+            return
+
+        session = self.checkpoint.load()
+
+        if not session:
+            self.set_status(GeneralStatus.ERROR)
+            self.set_message('There is no session to resume.')
+            return
+
+        search = session['search']
+
+        self.tree.delete(*self.tree.get_children())
+        self.__close_writer()
+        self.conversation_list = []
+        self.api.seen_tweet_ids = session['seen_ids']
+        self.api.conversation_heads = IdSet(
+            conversation[0]['id'] for conversation in session['conversations']
+        )
+        self.api.rejections.new_session()
+        self.api.clear_buffer()
+        self.tweet_queue.queue.clear()
+
+        # The cursor file is usually newer than the checkpoint, it is only
+        # used when the search is missing from it.
+        search_key = self.api.search_cursors.key(search['query'],
+                                                 search['language'],
+                                                 search['geocode'])
+        cursors = self.api.search_cursors.states
+        if session['cursor'] and search_key not in cursors:
+            cursors[search_key] = session['cursor']
+
+        for conversation in session['conversations']:
+            records = [TweetRecord.from_dict(t, keep_user=True)
+                       for t in conversation]
+            self.conversation_list.append((records,
+                                           search['formatted_query']))
+            self.tweet_queue.put(records)
+
+        # Show the filters of the resumed session.
+        self.language.set(search['language'])
+        self.search_terms_list.clear_entries()
+        for term in (search['query'] or '').split('&'):
+            if term and term != '*':
+                self.search_terms_list.entry.insert(0, term)
+                self.search_terms_list.add_entry()
+
+        self.set_status(GeneralStatus.FETCHING)
+        self.paused = False
+        self.api.halt = False
+        self.start_stop_button['text'] = 'Stop fetching'
+        self.set_message((
+            f'Resumed session with {len(self.conversation_list)} '
+            'conversations'
+        ))
+
+        threading.Thread(target=self.start_fetching,
+                         args=(search['query'],
+                               search['language'],
+                               search['geocode'],
+                               True)).start()
+
     def new_credentials(self):
         ''' Asks the user to provide a new credentials file and instructs the
             tweepy api to use the new credentials.
@@ -925,28 +1507,29 @@ class Feed(tk.Frame):
         try:
             conversation = self.tweet_queue.get(block=False)
 
-            parent_tweet = conversation.pop()
+            # The conversation itself is also saved, so it is not changed.
+            parent_tweet = conversation[-1]
 
-            if self.tree.exists(parent_tweet['id']):
+            if self.tree.exists(parent_tweet.id):
                 self.set_message('Trying to add already existing tweet.')
                 raise ValueError('Trying to add already existing tweet.')
 
             self.tree.insert(
                 '',
                 tk.END,
-                parent_tweet['id'],
-                text=parent_tweet['user']['screen_name'],
-                values=[self.textwrapper(parent_tweet['text'])],
+                parent_tweet.id,
+                text=parent_tweet.screen_name,
+                values=[self.textwrapper(parent_tweet.text)],
                 open=True
             )
 
-            for tweet in conversation:
+            for tweet in conversation[:-1]:
                 self.tree.insert(
-                    parent_tweet['id'],
+                    parent_tweet.id,
                     tk.END,
-                    tweet['id'],
-                    text=tweet['user']['screen_name'],
-                    values=[self.textwrapper(tweet['text'])],
+                    tweet.id,
+                    text=tweet.screen_name,
+                    values=[self.textwrapper(tweet.text)],
                 )
 
         except (queue.Empty, ValueError):
@@ -955,34 +1538,70 @@ class Feed(tk.Frame):
         self.after(100, self.__update_treeview)
 
     def save(self):
-        ''' Saves the fetched conversations to a json file '''
-        self.set_status(GeneralStatus.PARSING)
+        ''' Saves the fetched conversations to a json lines file. From then
+            on, every new conversation of this session gets appended to the
+            same file as soon as it comes in, on a writer thread.
+        '''
+        if self.writer:
+            self.set_message(f'Conversations are saved to {self.writer.path}')
+            return
+
+        with self.save_lock:
+            if not self.conversation_list:
+                self.set_status(GeneralStatus.ERROR)
+                self.set_message('No conversations to export')
+                return
 
-        if len(self.conversation_list) > 0:
             now = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-            filename = f'{now}-{self.conversation_list[0][1]}.json'
+            filename = f'{now}-{self.conversation_list[0][1]}.jsonl'
 
-            with open(filename, 'w') as out_file:
-                json.dump({
-                    'conversations': [conv[0]
-                                      for conv in self.conversation_list
-                                      if conv[0]]
-                }, out_file)
+            try:
+                self.writer = ConversationWriter(filename)
+            except OSError as err:
+                self.set_status(GeneralStatus.ERROR)
+                self.set_message(f'Could not save conversations, {err}')
+                return
 
-            self.set_status(GeneralStatus.IDLE)
-            self.set_message('Conversations were exported')
-        else:
+            for conversation, _ in self.conversation_list:
+                if conversation:
+                    self.writer.write(conversation)
+
+        self.set_message(
+            f'Conversations are saved to {filename} as they come in'
+        )
+
+    def __close_writer(self):
+        ''' Finishes the save file of the current session, reports it when
+            writing to the file failed
+        '''
+        with self.save_lock:
+            if not self.writer:
+                return
+
+            self.writer.close()
+            error = self.writer.error
+            path = self.writer.path
+            self.writer = None
+
+        if error:
             self.set_status(GeneralStatus.ERROR)
-            self.set_message('No conversations to export')
+            self.set_message(f'Could not save conversations to {path}, '
+                             f'{error}')
 
     def clean_up(self):
         ''' Waits for all threads from all widgets to close down and closes
             the window main window afterwards.
         '''
+        # Halting makes the api stop waiting for the rate limit and stop
+        # searching, otherwise this waits until the search is used up.
+        self.paused = True
+        self.api.halt = True
+
         while self.is_busy():
-            self.paused = True
             time.sleep(0.1)
 
+        self.__close_writer()
+        self.checkpoint.end()
         self.clean_up_parent()
 
         return True
@@ -1012,6 +1631,11 @@ class Notebook(ttk.Notebook):
         self.select(self.feed)
         self.feed.save()
 
+    def resume_session(self):
+        ''' Resumes the last harvest session '''
+        self.select(self.feed)
+        self.feed.resume_session()
+
     def new_credentials(self):
         ''' Asks the user to put in new credentials '''
         self.select(self.feed)
@@ -1019,8 +1643,13 @@ class Notebook(ttk.Notebook):
 
     def clean_up(self):
         ''' Calls the cleanup functions on all child widgets '''
+        self.cd.clean_up()
+
+        # The writer and checkpoint also need to be closed when the feed is
+        # not fetching.
+        self.feed.clean_up()
+
         while self.feed.is_busy():
-            self.feed.clean_up()
             time.sleep(0.1)
 
         self.parent_cleanup()
@@ -1042,6 +1671,8 @@ def main():
     file_menu = tk.Menu(menu_bar, tearoff=0)
     file_menu.add_command(label="Save", command=notebook.save)
     file_menu.add_command(label="Open", command=notebook.open_file)
+    file_menu.add_command(label="Resume session",
+                          command=notebook.resume_session)
     file_menu.add_command(label="Exit", command=notebook.clean_up)
 
     options_menu = tk.Menu(menu_bar, tearoff=0)
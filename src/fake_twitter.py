@@ -0,0 +1,321 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+File name:  fake_twitter.py
+Authors:    Erwin Meijerhof (S2377012)
+            Wessel Poelman  (S2976129)
+Date:       16-10-2026
+GitHub:     https://github.com/WPoelman/hci-final-project
+Description:
+    Local stand-in for the parts of the Twitter v1.1 api that are used by
+    this program: search/tweets, statuses/show, statuses/lookup and the
+    statuses/filter stream, which replays the replies in the corpus. The
+    tweets come from conversation files saved by the program, so the fetch
+    path can be tried out and benchmarked without credentials or spending
+    any of the rate limit.
+Usage:
+    python fake_twitter.py <conversation file> [port]
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from conversation_file import read_conversations
+
+
+class TweetCorpus:
+    ''' Collection of tweets that can be searched and looked up like the
+        Twitter api does.
+    '''
+
+    def __init__(self, tweets=None):
+        self.tweets = {}
+
+        for tweet in tweets or []:
+            self.add(tweet)
+
+    @classmethod
+    def from_file(cls, path):
+        ''' Creates a corpus from a conversation file saved by the program,
+            in the json or the json lines format
+        '''
+        return cls.from_conversations(read_conversations(path))
+
+    @classmethod
+    def from_conversations(cls, conversations):
+        ''' Creates a corpus from a list of conversations. Saved
+            conversations do not contain the main 'parent' tweet, so a
+            stand-in is made for every missing parent.
+        '''
+        corpus = cls()
+
+        for conversation in conversations:
+            for tweet in conversation:
+                corpus.add(tweet)
+
+        for conversation in conversations:
+            if not conversation:
+                continue
+
+            oldest = conversation[-1]
+            parent_id = oldest.get('in_reply_to_status_id')
+
+            if parent_id and parent_id not in corpus.tweets:
+                corpus.add({
+                    'created_at': oldest['created_at'],
+                    'id': parent_id,
+                    'text': f'Conversation starter {parent_id}',
+                    'in_reply_to_user_id': None,
+                    'in_reply_to_status_id': None,
+                    'in_reply_to_screen_name': None,
+                    'user': {
+                        'id': oldest.get('in_reply_to_user_id'),
+                        'screen_name': oldest.get('in_reply_to_screen_name'),
+                    },
+                })
+
+        return corpus
+
+    def add(self, tweet):
+        ''' Adds a single tweet dict to the corpus '''
+        self.tweets[tweet['id']] = tweet
+
+    def show(self, tweet_id):
+        ''' Returns the tweet with the given id or None '''
+        return self.tweets.get(tweet_id)
+
+    def lookup(self, ids):
+        ''' Returns the tweets that exist for the given ids '''
+        return [self.tweets[i] for i in ids if i in self.tweets]
+
+    def search(self, query=None, lang=None, count=15, max_id=None,
+               since_id=None):
+        ''' Returns at most count tweets matching the query, newest first.
+            A query matches if any of its terms occur in the text, '*' or
+            no query matches everything.
+        '''
+        terms = []
+        if query and query != '*':
+            terms = [t.lower() for t in query.replace('&', ' ').split()]
+
+        results = []
+
+        for tweet_id in sorted(self.tweets, reverse=True):
+            if max_id is not None and tweet_id > max_id:
+                continue
+            if since_id is not None and tweet_id <= since_id:
+                break
+
+            tweet = self.tweets[tweet_id]
+
+            if lang and tweet.get('lang', lang) != lang:
+                continue
+            if terms and not any(t in tweet['text'].lower() for t in terms):
+                continue
+
+            results.append(tweet)
+
+            if len(results) == count:
+                break
+
+        return results
+
+    def stream(self, track=None, language=None):
+        ''' Returns the replies that the filtered stream would send, oldest
+            first. Terms are separated by commas and match if all of their
+            words occur in the text. Saved tweets have no coordinates, so
+            there is no location filter.
+        '''
+        terms = [t.lower().split() for t in (track or '').split(',') if t]
+
+        return [
+            tweet
+            for _, tweet in sorted(self.tweets.items())
+            if tweet['in_reply_to_status_id'] and
+            (not language or tweet.get('lang', language) == language) and
+            (not terms or any(all(w in tweet['text'].lower() for w in term)
+                              for term in terms))
+        ]
+
+
+class StandInServer:
+    ''' Serves a TweetCorpus over HTTP on the same paths as the Twitter api,
+        with keep-alive connections.
+
+        corpus:     TweetCorpus to serve
+        host:       host to listen on
+        port:       port to listen on, 0 picks a free port
+        latency:    seconds every request is delayed, to mimic the network
+        interval:   seconds between two tweets on the stream
+    '''
+
+    def __init__(self, corpus, host='127.0.0.1', port=0, latency=0.0,
+                 interval=0.05):
+        self.corpus = corpus
+        self.latency = latency
+        self.interval = interval
+        self.requests = 0
+        self.stopped = threading.Event()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                server.handle(self)
+
+            def do_POST(self):
+                server.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        ''' Base url to use instead of https://api.twitter.com/1.1 '''
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}/1.1'
+
+    def start(self):
+        ''' Starts serving in a background thread '''
+        self.thread = threading.Thread(target=self.httpd.serve_forever,
+                                       daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        ''' Stops serving '''
+        self.stopped.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def send(self, handler, status, body, headers=None):
+        ''' Sends a json response '''
+        data = json.dumps(body).encode('utf-8')
+
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json;charset=utf-8')
+        handler.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def send_error(self, handler, status, code, message):
+        ''' Sends an error in the same format as the Twitter api '''
+        self.send(handler, status,
+                  {'errors': [{'code': code, 'message': message}]})
+
+    def send_stream(self, handler, tweets):
+        ''' Sends the tweets one by one as a chunked stream, followed by
+            keep-alives until the client disconnects.
+        '''
+        handler.close_connection = True
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Transfer-Encoding', 'chunked')
+        handler.end_headers()
+
+        def send_chunk(data):
+            handler.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+            handler.wfile.flush()
+
+        try:
+            for tweet in tweets:
+                if self.stopped.is_set():
+                    return
+
+                send_chunk(json.dumps(tweet).encode('utf-8') + b'\r\n')
+                self.stopped.wait(self.interval)
+
+            while not self.stopped.wait(1):
+                send_chunk(b'\r\n')
+
+        except (BrokenPipeError, ConnectionResetError):
+            # The client closed the stream.
+            pass
+
+    def handle(self, handler):
+        ''' Answers a single request '''
+        self.requests += 1
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        url = urlparse(handler.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        # The stream endpoint takes its parameters as a form.
+        if handler.command == 'POST':
+            length = int(handler.headers.get('Content-Length', 0))
+            body = handler.rfile.read(length).decode('utf-8')
+            params.update((k, v[-1]) for k, v in parse_qs(body).items())
+
+        try:
+            if url.path == '/1.1/statuses/filter.json':
+                self.send_stream(handler, self.corpus.stream(
+                    params.get('track'),
+                    params.get('language')
+                ))
+
+            elif url.path == '/1.1/search/tweets.json':
+                statuses = self.corpus.search(
+                    params.get('q'),
+                    params.get('lang'),
+                    int(params.get('count', 15)),
+                    int(params['max_id']) if 'max_id' in params else None,
+                    int(params['since_id']) if 'since_id' in params else None
+                )
+                self.send(handler, 200, {
+                    'statuses': statuses,
+                    'search_metadata': {'count': len(statuses)},
+                })
+
+            elif url.path == '/1.1/statuses/show.json':
+                tweet = self.corpus.show(int(params['id']))
+                if tweet:
+                    self.send(handler, 200, tweet)
+                else:
+                    self.send_error(handler, 404, 144,
+                                    'No status found with that ID.')
+
+            elif url.path == '/1.1/statuses/lookup.json':
+                ids = [int(i) for i in params.get('id', '').split(',') if i]
+                self.send(handler, 200, self.corpus.lookup(ids))
+
+            else:
+                self.send_error(handler, 404, 34,
+                                'Sorry, that page does not exist.')
+
+        except (KeyError, ValueError):
+            self.send_error(handler, 400, 44, 'Invalid parameters.')
+
+
+def main():
+    if len(sys.argv) < 2:
+        print('Usage: python fake_twitter.py <conversation file> [port]')
+        exit(1)
+
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8080
+    server = StandInServer(TweetCorpus.from_file(sys.argv[1]), port=port)
+
+    print(f'Serving on {server.url}')
+
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
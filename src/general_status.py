@@ -0,0 +1,26 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+File name:  general_status.py
+Authors:    Erwin Meijerhof (S2377012)
+            Wessel Poelman  (S2976129)
+Date:       16-10-2026
+GitHub:     https://github.com/WPoelman/hci-final-project
+Description:
+    Status enum that is shared between the frames and the different api
+    backends, so they can compare each other's status.
+Usage:
+    from general_status import GeneralStatus
+"""
+
+from enum import Enum
+
+
+class GeneralStatus(Enum):
+    ''' Enum used for indicating a status '''
+    IDLE = 'idle'
+    FETCHING = 'fetching'
+    RETRYING = 'retrying'
+    PARSING = 'parsing'
+    ERROR = 'error'
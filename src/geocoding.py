@@ -0,0 +1,175 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+File name:  geocoding.py
+Authors:    Erwin Meijerhof (S2377012)
+            Wessel Poelman  (S2976129)
+Date:       16-10-2026
+GitHub:     https://github.com/WPoelman/hci-final-project
+Description:
+    Geocoding stage for the location filter. Addresses are turned into
+    coordinates on a background thread, so the lookup can start as soon as
+    an address is typed in. Results are kept in a json file, so an address
+    that was resolved in an earlier session does not need the network again.
+    Requests to the resolver are spaced out to follow the Nominatim usage
+    policy of at most one request per second.
+Usage:
+    geocoder = Geocoder('geocode_cache.json')
+    future = geocoder.submit('Groningen')
+    ...
+    coordinates = future.result()   # (latitude, longitude) or None
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from os.path import isfile
+
+from geopy import Nominatim
+from geopy.exc import GeopyError
+
+
+def nominatim_resolver(user_agent='hci_final_project'):
+    ''' Returns a resolver that uses the Nominatim service '''
+    geolocator = Nominatim(user_agent=user_agent)
+
+    def resolve(address):
+        geo = geolocator.geocode(address)
+        return (geo.latitude, geo.longitude) if geo else None
+
+    return resolve
+
+
+class Geocoder:
+    ''' Resolves addresses to (latitude, longitude) tuples.
+
+        cache_path:     path to the json file with resolved addresses, None
+                        only keeps them in memory
+        resolver:       function that takes an address and returns a
+                        (latitude, longitude) tuple or None if it could not
+                        be found, defaults to Nominatim
+        min_interval:   minimum number of seconds between two resolver calls
+    '''
+
+    def __init__(self, cache_path='geocode_cache.json', resolver=None,
+                 min_interval=1.0):
+        self.cache_path = cache_path
+        self.resolver = resolver if resolver else nominatim_resolver()
+        self.min_interval = min_interval
+
+        # Maps normalized address -> [latitude, longitude] or None for
+        # addresses that do not exist.
+        self.cache = {}
+
+        if cache_path and isfile(cache_path):
+            try:
+                with open(cache_path) as f:
+                    self.cache = json.load(f)
+            except (OSError, ValueError):
+                self.cache = {}
+
+        # A single worker keeps the resolver calls one at a time, the lock
+        # protects the cache, which is also read from other threads.
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.lock = threading.Lock()
+        self.last_request = 0.0
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(address):
+        ''' Makes small differences in typing end up as the same address '''
+        return ' '.join(address.lower().split())
+
+    def cached(self, address):
+        ''' Returns (True, coordinates) if the address is in the cache,
+            otherwise (False, None).
+        '''
+        key = self.normalize(address)
+
+        with self.lock:
+            if key in self.cache:
+                coordinates = self.cache[key]
+                return True, tuple(coordinates) if coordinates else None
+
+        return False, None
+
+    def resolve(self, address):
+        ''' Returns the coordinates of the address, blocks until they are
+            known. Returns None if the address could not be resolved.
+        '''
+        if not address or not address.strip():
+            return None
+
+        found, coordinates = self.cached(address)
+
+        if found:
+            self.hits += 1
+            return coordinates
+
+        return self.submit(address).result()
+
+    def submit(self, address):
+        ''' Starts resolving the address in the background and returns a
+            future with the coordinates.
+        '''
+        return self.executor.submit(self.__lookup, address)
+
+    def __lookup(self, address):
+        ''' Looks up an address with the resolver, runs on the worker '''
+        if not address or not address.strip():
+            return None
+
+        # The same address might have been resolved while this one was
+        # waiting for the worker.
+        found, coordinates = self.cached(address)
+
+        if found:
+            self.hits += 1
+            return coordinates
+
+        self.misses += 1
+
+        wait = self.last_request + self.min_interval - time.time()
+        if wait > 0:
+            time.sleep(wait)
+
+        try:
+            coordinates = self.resolver(address)
+        except GeopyError:
+            # Service problems are not remembered, the next try might work.
+            return None
+        finally:
+            self.last_request = time.time()
+
+        with self.lock:
+            self.cache[self.normalize(address)] = (
+                list(coordinates) if coordinates else None
+            )
+
+        self.save()
+
+        return tuple(coordinates) if coordinates else None
+
+    def save(self):
+        ''' Writes the cache to disk, using a rename so a crash halfway never
+            leaves a broken file behind.
+        '''
+        if not self.cache_path:
+            return
+
+        with self.lock:
+            tmp_path = f'{self.cache_path}.tmp'
+
+            with open(tmp_path, 'w') as f:
+                json.dump(self.cache, f)
+
+            os.replace(tmp_path, self.cache_path)
+
+    def close(self):
+        ''' Stops the worker '''
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,126 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+File name:  id_set.py
+Authors:    Erwin Meijerhof (S2377012)
+            Wessel Poelman  (S2976129)
+Date:       16-10-2026
+GitHub:     https://github.com/WPoelman/hci-final-project
+Description:
+    Compact set of tweet ids for removing duplicate conversations during long
+    harvests. A Python set of ints takes tens of bytes per id, this keeps
+    the ids in a sorted array of 64-bit ints (8 bytes per id) and uses
+    bisection to look them up. New ids first go into a small buffer, which
+    gets merged into the array once it is full.
+Usage:
+    seen = IdSet()
+    seen.update(ids)
+    seen.contains_all(ids)
+"""
+
+import bisect
+import heapq
+import threading
+import time
+from array import array
+
+
+class IdSet:
+    ''' Set of 64-bit tweet ids backed by a sorted array.
+
+        buffer_size:    minimum number of ids collected before merging them
+                        into the array, the buffer grows along with the array
+                        so merging stays cheap
+    '''
+
+    def __init__(self, ids=None, buffer_size=4096):
+        self.buffer_size = buffer_size
+        self.ids = array('q')
+        self.buffer = set()
+
+        # The fetch threads can add ids while others are being checked.
+        self.lock = threading.Lock()
+
+        # Number of ids looked up and the time that took, for reporting.
+        self.lookups = 0
+        self.lookup_time = 0.0
+
+        if ids:
+            self.update(ids)
+
+    def __len__(self):
+        return len(self.ids) + len(self.buffer)
+
+    def __contains__(self, tweet_id):
+        with self.lock:
+            return self.__contains(tweet_id)
+
+    def __contains(self, tweet_id):
+        ''' Membership test, the lock has to be held '''
+        if tweet_id in self.buffer:
+            return True
+
+        i = bisect.bisect_left(self.ids, tweet_id)
+        return i < len(self.ids) and self.ids[i] == tweet_id
+
+    def __merge(self):
+        ''' Merges the buffer into the sorted array '''
+        self.ids = array('q', heapq.merge(self.ids, sorted(self.buffer)))
+        self.buffer = set()
+
+    def contains_all(self, ids):
+        ''' Indicates if all given ids are in the set, the same as
+            set(ids).issubset(seen) but without building a new set.
+        '''
+        start = time.perf_counter()
+
+        with self.lock:
+            ids = list(ids)
+            result = all(self.__contains(i) for i in ids)
+
+        self.lookups += len(ids)
+        self.lookup_time += time.perf_counter() - start
+
+        return result
+
+    def update(self, ids):
+        ''' Adds all given ids '''
+        with self.lock:
+            self.buffer.update(i for i in ids if not self.__contains(i))
+
+            if len(self.buffer) >= max(self.buffer_size, len(self.ids) // 16):
+                self.__merge()
+
+    def to_bytes(self):
+        ''' Returns the sorted ids as raw 64-bit ints '''
+        with self.lock:
+            self.__merge()
+            return self.ids.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data, buffer_size=4096):
+        ''' Creates a set from the output of 'to_bytes' '''
+        id_set = cls(buffer_size=buffer_size)
+        id_set.ids.frombytes(data)
+        return id_set
+
+    def clear(self):
+        ''' Removes all ids '''
+        with self.lock:
+            self.ids = array('q')
+            self.buffer = set()
+
+    def memory_usage(self):
+        ''' Returns the approximate number of bytes used by the ids '''
+        # A set entry costs about 60 bytes (table slot and the int object).
+        return self.ids.itemsize * len(self.ids) + 60 * len(self.buffer)
+
+    def summary(self):
+        ''' Returns a short string with the size and the lookup cost '''
+        per_lookup = self.lookup_time / self.lookups if self.lookups else 0
+
+        return (
+            f'{len(self)} seen ids in {self.memory_usage() / 1e6:.1f} MB, '
+            f'{per_lookup * 1e6:.1f} µs per lookup'
+        )
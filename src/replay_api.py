@@ -0,0 +1,353 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+File name:  replay_api.py
+Authors:    Erwin Meijerhof (S2377012)
+            Wessel Poelman  (S2976129)
+Date:       16-10-2026
+GitHub:     https://github.com/WPoelman/hci-final-project
+Description:
+    Record and replay backends for the Twitter api. The Recorder wraps a
+    real tweepy api and writes every search and status response to a json
+    lines file. The ReplayApi answers the same calls as tweepy.API from a
+    recording or a saved conversation file, in the same process, with
+    configurable latency, rate limit headers and injected errors. The
+    TweepyApi classes can use it as their backend, so the fetch path can be
+    benchmarked and checked without credentials or spending rate limit.
+Usage:
+    python replay_api.py <credentials file> <query> <recording> [amount]
+    api = TweepyApi(backend=ReplayApi.from_file('recording.jsonl'))
+"""
+
+import json
+import random
+import sys
+import threading
+import time
+
+import tweepy
+from tweepy.models import SearchResults, Status
+
+from fake_twitter import TweetCorpus
+from scheduler import (DEFAULT_LIMITS, WINDOW, ThreadedApi,
+                       ThreadLocalResponse)
+
+
+class ReplayResponse:
+    ''' Stand-in for the requests response that tweepy keeps as
+        'last_response' and puts in its errors.
+    '''
+
+    def __init__(self, status_code, body, headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+
+    @property
+    def text(self):
+        return json.dumps(self.body)
+
+    def json(self):
+        return self.body
+
+
+class Recorder:
+    ''' Wraps a tweepy api and records the responses of the calls that the
+        program uses. Every other attribute is passed on to the api.
+
+        api:    tweepy.API instance
+        path:   json lines file the responses are appended to
+    '''
+
+    def __init__(self, api, path):
+        # The response of a call is read once it returns, while the other
+        # fetching threads keep calling, so it has to be kept per thread.
+        self.api = ThreadedApi.wrap(api)
+        self.path = path
+        self.lock = threading.Lock()
+        self.recorded = 0
+
+    def __getattr__(self, name):
+        return getattr(self.api, name)
+
+    def __record(self, endpoint, params, func, *args, **kwargs):
+        ''' Calls the api and writes the raw response of this call to the
+            recording
+        '''
+        try:
+            result = func(*args, **kwargs)
+            response = self.api.last_response
+        except tweepy.error.TweepError as err:
+            response = err.response
+            result = err
+
+        if response is not None:
+            try:
+                body = response.json()
+            except ValueError:
+                body = None
+
+            entry = {
+                'endpoint': endpoint,
+                'params': params,
+                'time': time.time(),
+                'status_code': response.status_code,
+                'headers': {
+                    key: value
+                    for key, value in response.headers.items()
+                    if key.lower().startswith('x-rate-limit')
+                },
+                'body': body,
+            }
+
+            with self.lock:
+                with open(self.path, 'a') as f:
+                    f.write(json.dumps(entry) + '\n')
+                self.recorded += 1
+
+        if isinstance(result, tweepy.error.TweepError):
+            raise result
+
+        return result
+
+    def search(self, **kwargs):
+        return self.__record('search', kwargs, self.api.search, **kwargs)
+
+    def statuses_lookup(self, id_, **kwargs):
+        return self.__record('statuses/lookup', {'id': list(id_)},
+                             self.api.statuses_lookup, id_, **kwargs)
+
+    def get_status(self, id, **kwargs):
+        return self.__record('statuses/show', {'id': id},
+                             self.api.get_status, id, **kwargs)
+
+
+class ReplayApi:
+    ''' Answers search, statuses_lookup and get_status calls like tweepy.API
+        does, from a corpus of tweets.
+
+        corpus:         TweetCorpus with the tweets to serve
+        latency:        seconds every call takes
+        limits:         dict with the number of calls per rate limit window
+                        per endpoint, None turns the rate limit off
+        window:         length of the rate limit window in seconds
+        error_rate:     fraction of the calls that fail with a server error
+        missing_rate:   fraction of the tweets that look deleted
+        seed:           seed for the injected errors and missing tweets
+    '''
+
+    # The fetching threads share the api, so like ThreadedApi the latest
+    # response is kept per thread.
+    last_response = ThreadLocalResponse()
+
+    def __init__(self, corpus, latency=0.0, limits=DEFAULT_LIMITS,
+                 window=WINDOW, error_rate=0.0, missing_rate=0.0, seed=0):
+        self.corpus = corpus
+        self.latency = latency
+        self.limits = limits
+        self.window = window
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+
+        # Decided once, so a missing tweet stays missing.
+        self.missing = {
+            tweet_id
+            for tweet_id in sorted(corpus.tweets)
+            if self.random.random() < missing_rate
+        }
+
+        self.remaining = dict(limits) if limits else {}
+        self.reset_at = time.time() + window
+
+        self.lock = threading.Lock()
+        self.calls = {endpoint: 0 for endpoint in DEFAULT_LIMITS}
+        self.errors = 0
+
+        # The same attributes tweepy.API has, the auth only makes the stream
+        # code work, it is never checked.
+        self.last_response = None
+        self.auth = tweepy.OAuthHandler('replay', 'replay')
+        self.auth.set_access_token('replay', 'replay')
+
+    @staticmethod
+    def is_recording(path):
+        ''' Indicates if the file is a recording made by the Recorder. Both
+            the recordings and the conversation files of the program can be
+            json lines files, but a line of a recording is a response and a
+            line of a conversation file a list of tweets.
+        '''
+        if not path.endswith('.jsonl'):
+            return False
+
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    return isinstance(entry, dict) and 'endpoint' in entry
+
+        return False
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        ''' Creates a replay api from a recording (.jsonl) made by the
+            Recorder or from a conversation file (.json or .jsonl) saved by
+            the program.
+        '''
+        if cls.is_recording(path):
+            corpus = TweetCorpus()
+
+            with open(path) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+
+                    body = json.loads(line)['body']
+
+                    if isinstance(body, dict) and 'statuses' in body:
+                        tweets = body['statuses']
+                    elif isinstance(body, dict) and 'id' in body:
+                        tweets = [body]
+                    elif isinstance(body, list):
+                        tweets = body
+                    else:
+                        tweets = []
+
+                    for tweet in tweets:
+                        corpus.add(tweet)
+        else:
+            corpus = TweetCorpus.from_file(path)
+
+        return cls(corpus, **kwargs)
+
+    def __respond(self, endpoint, body):
+        ''' Keeps the rate limit, injects errors and sets 'last_response' '''
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self.lock:
+            self.calls[endpoint] += 1
+            now = time.time()
+
+            if now >= self.reset_at:
+                self.remaining = dict(self.limits) if self.limits else {}
+                self.reset_at = now + self.window
+
+            headers = {}
+
+            if self.limits:
+                if self.remaining[endpoint] <= 0:
+                    headers = {
+                        'x-rate-limit-limit': str(self.limits[endpoint]),
+                        'x-rate-limit-remaining': '0',
+                        'x-rate-limit-reset': str(int(self.reset_at)),
+                    }
+                    response = ReplayResponse(429, {'errors': [{
+                        'code': 88, 'message': 'Rate limit exceeded'
+                    }]}, headers)
+                    self.last_response = response
+
+                    raise tweepy.error.RateLimitError(
+                        'Rate limit exceeded', response
+                    )
+
+                self.remaining[endpoint] -= 1
+                headers = {
+                    'x-rate-limit-limit': str(self.limits[endpoint]),
+                    'x-rate-limit-remaining': str(self.remaining[endpoint]),
+                    'x-rate-limit-reset': str(int(self.reset_at)),
+                }
+
+            if self.error_rate and self.random.random() < self.error_rate:
+                self.errors += 1
+                response = ReplayResponse(503, {'errors': [{
+                    'code': 130, 'message': 'Over capacity'
+                }]}, headers)
+                self.last_response = response
+
+                raise tweepy.error.TweepError('Over capacity', response, 130)
+
+            self.last_response = ReplayResponse(200, body, headers)
+
+    def __visible(self, tweets):
+        ''' Leaves out the tweets that are made to look deleted '''
+        return [t for t in tweets if t['id'] not in self.missing]
+
+    def search(self, q=None, lang=None, geocode=None, count=15, max_id=None,
+               since_id=None, **kwargs):
+        ''' Same as tweepy.API.search, saved tweets have no location so the
+            geocode is not used.
+        '''
+        statuses = self.__visible(
+            self.corpus.search(q, lang, int(count), max_id, since_id)
+        )
+        body = {
+            'statuses': statuses,
+            'search_metadata': {'count': len(statuses), 'query': q},
+        }
+        self.__respond('search', body)
+
+        return SearchResults.parse(None, body)
+
+    def statuses_lookup(self, id_, **kwargs):
+        ''' Same as tweepy.API.statuses_lookup '''
+        statuses = self.__visible(self.corpus.lookup(list(id_)[:100]))
+        self.__respond('statuses/lookup', statuses)
+
+        return [Status.parse(None, status) for status in statuses]
+
+    def get_status(self, id, **kwargs):
+        ''' Same as tweepy.API.get_status '''
+        tweet = self.corpus.show(int(id))
+
+        if not tweet or tweet['id'] in self.missing:
+            self.__respond('statuses/show', None)
+            response = ReplayResponse(404, {'errors': [{
+                'code': 144, 'message': 'No status found with that ID.'
+            }]})
+            self.last_response = response
+
+            raise tweepy.error.TweepError('No status found with that ID.',
+                                          response, 144)
+
+        self.__respond('statuses/show', tweet)
+
+        return Status.parse(None, tweet)
+
+
+def main():
+    if len(sys.argv) < 4:
+        print((
+            'Usage: python replay_api.py <credentials file> <query> '
+            '<recording> [amount]'
+        ))
+        exit(1)
+
+    # Imported here, so the replay api can be used without the gui modules.
+    from coursework3 import TweepyApi
+
+    credentials_path, query, path = sys.argv[1:4]
+    amount = int(sys.argv[4]) if len(sys.argv) > 4 else 50
+
+    api = TweepyApi(credentials_path, cache_path=None, search_state_path=None)
+
+    if not api.api:
+        print(api.get_message())
+        exit(1)
+
+    api.api = Recorder(api.api, path)
+    found = []
+
+    def add_conversation(conversation):
+        found.append(conversation)
+        if len(found) >= amount:
+            api.halt = True
+
+    api.fetch_conversations(query, callback=add_conversation)
+
+    print(f'Recorded {api.api.recorded} responses for {len(found)} '
+          f'conversations to {path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+File name:  reply_stream.py
+Authors:    Erwin Meijerhof (S2377012)
+            Wessel Poelman  (S2976129)
+Date:       16-10-2026
+GitHub:     https://github.com/WPoelman/hci-final-project
+Description:
+    Client for the filtered stream endpoint (statuses/filter) that passes on
+    the replies matching the search terms, language and location as soon as
+    they are tweeted. This is an alternative to polling the search endpoint,
+    every reply only comes in once and there is no paging. The tweepy Stream
+    class always connects to stream.twitter.com over https, so this client
+    uses requests directly, which means it can also be pointed at the local
+    stand-in in fake_twitter.py. Reconnecting follows the backoff rules of
+    the Twitter streaming guidelines.
+Usage:
+    stream = ReplyStream(api.auth.apply_auth(), 'covid-19', 'en')
+    stream.start(on_reply)
+    ...
+    stream.close()
+"""
+
+import json
+import math
+import threading
+import time
+
+import requests
+
+STREAM_URL = 'https://stream.twitter.com/1.1/statuses/filter.json'
+
+# Twitter sends a keep-alive every 30 seconds, no data for 90 seconds means
+# the connection stalled.
+STALL_TIMEOUT = 90
+
+
+def track_terms(query):
+    ''' Turns a search query of the Feed into stream track terms '''
+    if not query or query == '*':
+        return []
+
+    return [term.strip() for term in query.split('&') if term.strip()]
+
+
+def bounding_box(geocode):
+    ''' Turns a 'latitude,longitude,radius' geocode into the bounding box
+        [south west longitude, south west latitude, north east longitude,
+        north east latitude] that the stream endpoint wants.
+    '''
+    latitude, longitude, radius = geocode.split(',')
+    latitude, longitude = float(latitude), float(longitude)
+    radius = float(radius.rstrip('km'))
+
+    # One degree of latitude is about 111 km, the same goes for longitude at
+    # the equator.
+    lat_delta = radius / 111.32
+    lon_delta = radius / (111.32 * max(math.cos(math.radians(latitude)), 0.01))
+
+    return [
+        max(longitude - lon_delta, -180), max(latitude - lat_delta, -90),
+        min(longitude + lon_delta, 180), min(latitude + lat_delta, 90),
+    ]
+
+
+class ReplyStream:
+    ''' Long-lived filtered stream of reply tweets.
+
+        auth:       requests auth object, for example from
+                    tweepy.OAuthHandler.apply_auth()
+        query:      search query as used by the Feed, terms joined by '&'
+        language:   language code of the wanted tweets
+        geocode:    optional 'latitude,longitude,radius' string
+        url:        url of the stream endpoint
+        halted:     function that indicates the stream should stop
+    '''
+
+    def __init__(self, auth, query=None, language=None, geocode=None,
+                 url=STREAM_URL, halted=None):
+        self.auth = auth
+        self.terms = track_terms(query)
+        self.language = language
+        self.box = bounding_box(geocode) if geocode else None
+        self.url = url
+        self.halted = halted if halted else (lambda: False)
+
+        self.response = None
+        self.thread = None
+        self.closed = False
+
+        # Set when the stream failed in a way reconnecting will not fix.
+        self.error = None
+
+        self.connects = 0
+        self.received = 0
+
+    def params(self):
+        ''' Returns the form parameters of the stream request '''
+        params = {'stall_warnings': 'true'}
+
+        if self.terms:
+            params['track'] = ','.join(self.terms)
+        if self.language:
+            params['language'] = self.language
+        if self.box:
+            params['locations'] = ','.join(f'{c:.4f}' for c in self.box)
+
+        return params
+
+    def __in_box(self, tweet):
+        ''' Indicates if the tweet was sent from within the bounding box '''
+        west, south, east, north = self.box
+
+        if tweet.get('coordinates'):
+            longitude, latitude = tweet['coordinates']['coordinates']
+        elif tweet.get('place') and tweet['place'].get('bounding_box'):
+            corners = tweet['place']['bounding_box']['coordinates'][0]
+            longitude = sum(c[0] for c in corners) / len(corners)
+            latitude = sum(c[1] for c in corners) / len(corners)
+        else:
+            return False
+
+        return west <= longitude <= east and south <= latitude <= north
+
+    def matches(self, tweet):
+        ''' Indicates if a tweet from the stream is a wanted reply. The
+            endpoint combines the terms and the location with 'or', so both
+            are checked again here.
+        '''
+        if not tweet.get('in_reply_to_status_id'):
+            return False
+        if 'retweeted_status' in tweet:
+            return False
+        if self.language and tweet.get('lang', self.language) != self.language:
+            return False
+
+        if self.terms:
+            text = tweet.get('text', '').lower()
+
+            # Spaces within a term mean 'and', different terms mean 'or'.
+            if not any(all(word in text for word in term.lower().split())
+                       for term in self.terms):
+                return False
+
+        if self.box and not self.__in_box(tweet):
+            return False
+
+        return True
+
+    def __sleep(self, seconds):
+        ''' Sleeps in small steps, so closing does not take long '''
+        end = time.time() + seconds
+
+        while time.time() < end and not self.__stopped():
+            time.sleep(min(end - time.time(), 0.25))
+
+    def __stopped(self):
+        ''' Indicates if reading should stop '''
+        return self.closed or self.halted()
+
+    def __read(self, on_reply):
+        ''' Reads from a single connection until it ends or until the
+            stream is stopped
+        '''
+        lines = self.response.iter_lines(chunk_size=512)
+
+        while not self.__stopped():
+            try:
+                line = next(lines, None)
+            except Exception:
+                # Closing the connection from another thread makes a read
+                # that is waiting fail, with whatever error the connection
+                # raises at that point. Any other failure is a real one.
+                if self.__stopped():
+                    return
+                raise
+
+            if line is None:
+                return
+
+            # Empty lines are keep-alives.
+            if not line:
+                continue
+
+            try:
+                tweet = json.loads(line)
+            except ValueError:
+                continue
+
+            # Notices like 'limit' and 'warning' are not tweets.
+            if 'id' not in tweet:
+                continue
+
+            self.received += 1
+
+            if self.matches(tweet):
+                on_reply(tweet)
+
+    def run(self, on_reply):
+        ''' Keeps the stream connected and passes every wanted reply to
+            on_reply, until closed or halted.
+        '''
+        network_backoff = 0
+        http_backoff = 0
+
+        while not self.__stopped():
+            try:
+                self.response = requests.post(
+                    self.url,
+                    data=self.params(),
+                    auth=self.auth,
+                    stream=True,
+                    timeout=(10, STALL_TIMEOUT)
+                )
+                self.connects += 1
+
+                status = self.response.status_code
+
+                if status in (401, 403, 404, 406, 413, 416):
+                    self.error = (
+                        f'Stream refused the request ({status}), '
+                        f'{self.response.text[:100]}'
+                    )
+                    return
+
+                if status in (420, 429):
+                    # Rate limited, start at a minute and double every time.
+                    http_backoff = http_backoff * 2 if http_backoff else 60
+                    self.__sleep(http_backoff)
+                    continue
+
+                if status != 200:
+                    # Other http errors, start at 5 seconds and double every
+                    # time, up to 320 seconds.
+                    http_backoff = min(http_backoff * 2 if http_backoff
+                                       else 5, 320)
+                    self.__sleep(http_backoff)
+                    continue
+
+                network_backoff = 0
+                http_backoff = 0
+
+                self.__read(on_reply)
+
+            except requests.RequestException:
+                # Network errors, back off linearly up to 16 seconds.
+                if self.__stopped():
+                    return
+
+                network_backoff = min(network_backoff + 0.25, 16)
+                self.__sleep(network_backoff)
+
+            finally:
+                if self.response is not None:
+                    self.response.close()
+
+    def start(self, on_reply):
+        ''' Runs the stream in a background thread '''
+        self.thread = threading.Thread(target=self.run,
+                                       args=(on_reply,),
+                                       daemon=True)
+        self.thread.start()
+        return self
+
+    def close(self):
+        ''' Stops the stream and closes the connection '''
+        self.closed = True
+
+        if self.response is not None:
+            self.response.close()
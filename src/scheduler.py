@@ -0,0 +1,319 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+File name:  scheduler.py
+Authors:    Erwin Meijerhof (S2377012)
+            Wessel Poelman  (S2976129)
+Date:       16-10-2026
+GitHub:     https://github.com/WPoelman/hci-final-project
+Description:
+    Rate limit aware scheduler that all Twitter api calls go through. Every
+    endpoint has its own token bucket, which is kept up to date using the
+    x-rate-limit-remaining and x-rate-limit-reset headers of the responses.
+    The remaining calls are spread out over the rest of the rate limit
+    window, so long harvests can use the whole window without running into
+    the limit. When the limit is hit anyway, the call is retried once the
+    window resets instead of failing.
+    The headers are read from the 'last_response' of the api right after a
+    call, in the thread that made it. When several threads share an api, it
+    should keep that response per thread, like ThreadedApi does.
+Usage:
+    api = ThreadedApi(auth)
+    scheduler = RequestScheduler(lambda: api.last_response.headers)
+    page = scheduler.call('search', api.search, q='covid-19')
+"""
+
+import asyncio
+import threading
+import time
+
+import tweepy
+
+# Length of a rate limit window in seconds.
+WINDOW = 15 * 60
+
+# Number of calls per window for the endpoints that are used, with user
+# authentication.
+DEFAULT_LIMITS = {
+    'search': 180,
+    'statuses/lookup': 900,
+    'statuses/show': 900,
+}
+
+
+class ThreadLocalResponse:
+    ''' Descriptor for the 'last_response' attribute of an api, every thread
+        only sees the response of its own latest call. tweepy sets the
+        attribute after every call, so without this the response read after
+        a call could belong to the call of another thread.
+    '''
+
+    def __set_name__(self, owner, name):
+        self.key = f'_{name}_per_thread'
+
+    def __responses(self, api):
+        ''' Returns the thread local storage of the api '''
+        responses = api.__dict__.get(self.key)
+
+        if responses is None:
+            responses = api.__dict__.setdefault(self.key, threading.local())
+
+        return responses
+
+    def __get__(self, api, owner=None):
+        if api is None:
+            return self
+
+        return getattr(self.__responses(api), 'response', None)
+
+    def __set__(self, api, response):
+        self.__responses(api).response = response
+
+
+class ThreadedApi(tweepy.API):
+    ''' tweepy.API that can be shared between threads, the 'last_response'
+        is kept per thread.
+    '''
+
+    last_response = ThreadLocalResponse()
+
+    @classmethod
+    def wrap(cls, api):
+        ''' Returns a ThreadedApi with the settings of a tweepy.API, other
+            apis are returned as they are
+        '''
+        if isinstance(api, cls) or not isinstance(api, tweepy.API):
+            return api
+
+        # Subclasses of tweepy.API keep their own calls.
+        threaded_cls = cls
+        if type(api) is not tweepy.API:
+            threaded_cls = type(f'Threaded{type(api).__name__}',
+                                (cls, type(api)),
+                                {})
+
+        threaded = threaded_cls.__new__(threaded_cls)
+        threaded.__dict__.update(api.__dict__)
+
+        return threaded
+
+
+class TokenBucket:
+    ''' Budget of a single endpoint.
+
+        limit:  number of calls per window
+        burst:  number of calls that can be done right after each other
+    '''
+
+    def __init__(self, limit, burst=10):
+        self.limit = limit
+        self.burst = burst
+
+        self.remaining = limit
+        self.reset_at = time.time() + WINDOW
+        self.tokens = min(burst, limit)
+        self.last_refill = time.time()
+
+    def __refill(self, now):
+        ''' Adds the tokens that came in since the last refill. The refill
+            rate spreads the remaining calls evenly over what is left of the
+            window.
+        '''
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + WINDOW
+
+        rate = self.remaining / max(self.reset_at - now, 1)
+        self.tokens = min(self.burst,
+                          self.remaining,
+                          self.tokens + (now - self.last_refill) * rate)
+        self.last_refill = now
+
+        return rate
+
+    def delay(self, now):
+        ''' Returns the number of seconds until the next call can be done '''
+        rate = self.__refill(now)
+
+        if self.tokens >= 1:
+            return 0
+        if self.remaining <= 0 or rate <= 0:
+            return max(self.reset_at - now, 0)
+
+        return (1 - self.tokens) / rate
+
+    def take(self):
+        ''' Uses up a single call '''
+        self.tokens -= 1
+        self.remaining -= 1
+
+    def update(self, headers):
+        ''' Corrects the budget with the rate limit headers of a response '''
+        remaining = headers.get('x-rate-limit-remaining')
+        reset = headers.get('x-rate-limit-reset')
+
+        if remaining is not None:
+            self.remaining = int(remaining)
+            self.tokens = min(self.tokens, self.remaining)
+        if reset is not None:
+            self.reset_at = float(reset)
+
+    def exhaust(self, headers):
+        ''' Marks the budget as used up until the window resets '''
+        self.remaining = 0
+        self.tokens = 0
+
+        reset = headers.get('x-rate-limit-reset') if headers else None
+        self.reset_at = float(reset) if reset else time.time() + WINDOW
+
+
+class RequestScheduler:
+    ''' Paces the calls to the different endpoints.
+
+        get_headers:    function that returns the headers of the latest
+                        response of the calling thread, used after every
+                        successful call
+        on_wait:        function that gets called with the endpoint and the
+                        number of seconds when a call has to wait for the
+                        rate limit window to reset
+        halted:         function that indicates waiting should stop
+        limits:         dict with the number of calls per window per endpoint
+    '''
+
+    def __init__(self, get_headers=None, on_wait=None, halted=None,
+                 limits=None):
+        self.get_headers = get_headers
+        self.on_wait = on_wait
+        self.halted = halted if halted else (lambda: False)
+
+        self.buckets = {
+            endpoint: TokenBucket(limit)
+            for endpoint, limit in (limits or DEFAULT_LIMITS).items()
+        }
+
+        # The buckets are shared between the fetching threads.
+        self.lock = threading.Lock()
+
+        self.calls = {endpoint: 0 for endpoint in self.buckets}
+        self.waited = 0.0
+
+    def __next_delay(self, endpoint):
+        ''' Takes a call from the bucket if possible, otherwise returns the
+            number of seconds to wait before trying again.
+        '''
+        bucket = self.buckets[endpoint]
+
+        with self.lock:
+            delay = bucket.delay(time.time())
+
+            if delay <= 0:
+                bucket.take()
+                self.calls[endpoint] += 1
+
+            return delay
+
+    def __notify(self, endpoint, delay):
+        ''' Lets the user of the scheduler know a long wait is coming '''
+        # Short waits are just pacing, no need to report those.
+        if self.on_wait and delay > 5:
+            self.on_wait(endpoint, delay)
+
+    def acquire(self, endpoint):
+        ''' Blocks until a call to the endpoint can be done. Returns False if
+            halted while waiting.
+        '''
+        while True:
+            if self.halted():
+                return False
+
+            delay = self.__next_delay(endpoint)
+
+            if delay <= 0:
+                return True
+
+            self.__notify(endpoint, delay)
+
+            # Halting does not wait for the rate limit, the wait is also done
+            # in small steps so halting does not take long.
+            if self.halted():
+                return False
+
+            step = min(delay, 1)
+            self.waited += step
+            time.sleep(step)
+
+    async def acquire_async(self, endpoint):
+        ''' Coroutine version of 'acquire' '''
+        while True:
+            if self.halted():
+                return False
+
+            delay = self.__next_delay(endpoint)
+
+            if delay <= 0:
+                return True
+
+            self.__notify(endpoint, delay)
+
+            if self.halted():
+                return False
+
+            step = min(delay, 1)
+            self.waited += step
+            await asyncio.sleep(step)
+
+    def observe(self, endpoint, headers):
+        ''' Updates the budget of the endpoint with response headers '''
+        with self.lock:
+            self.buckets[endpoint].update(headers)
+
+    def rate_limited(self, endpoint, headers):
+        ''' Marks the endpoint as out of calls until the window resets '''
+        with self.lock:
+            self.buckets[endpoint].exhaust(headers)
+
+    @staticmethod
+    def is_rate_limit_error(err):
+        ''' Indicates if a tweepy error is caused by the rate limit, not all
+            of them are raised as a RateLimitError.
+        '''
+        response = getattr(err, 'response', None)
+
+        return (isinstance(err, tweepy.error.RateLimitError) or
+                getattr(response, 'status_code', None) in (420, 429))
+
+    def call(self, endpoint, func, *args, **kwargs):
+        ''' Calls func once the endpoint has budget left. Calls that run into
+            the rate limit get queued again until the window resets. Returns
+            None when halted while waiting.
+        '''
+        while True:
+            if not self.acquire(endpoint):
+                return None
+
+            try:
+                result = func(*args, **kwargs)
+            except tweepy.error.TweepError as err:
+                if not self.is_rate_limit_error(err):
+                    raise
+
+                response = err.response
+                headers = response.headers if response is not None else None
+                self.rate_limited(endpoint, headers)
+                continue
+
+            if self.get_headers:
+                headers = self.get_headers()
+                if headers:
+                    self.observe(endpoint, headers)
+
+            return result
+
+    def summary(self):
+        ''' Returns a short string with the budget left per endpoint '''
+        with self.lock:
+            return ', '.join(
+                f'{endpoint} {bucket.remaining}/{bucket.limit}'
+                for endpoint, bucket in self.buckets.items()
+            )
@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+File name:  search_cursor.py
+Authors:    Erwin Meijerhof (S2377012)
+            Wessel Poelman  (S2976129)
+Date:       16-10-2026
+GitHub:     https://github.com/WPoelman/hci-final-project
+Description:
+    Keeps track of how far the search results of a search have been looked
+    at, so a new search continues where the previous one stopped instead of
+    starting at the newest results again. The position is kept per
+    (query, language, geocode) as max_id/since_id watermarks and is saved to
+    a json file, so it also survives a restart of the program. The saved
+    position only moves past a page once the conversations of that page were
+    handed out, so stopping halfway never skips part of the results.
+Usage:
+    cursor = SearchCursorStore('search_state.json').cursor(key)
+    params = cursor.next_params()
+    ...
+    position = cursor.advance(ids_of_the_returned_page)
+    ...
+    cursor.commit(position)
+"""
+
+import json
+import os
+import threading
+from os.path import isfile
+
+# Maximum number of tweets per page the search endpoint returns.
+SEARCH_COUNT = 100
+
+
+class SearchCursor:
+    ''' Position in the search results of a single search.
+
+        The covered part of the results is the range of ids between 'bottom'
+        and 'top'. Every search first catches up on tweets newer than 'top',
+        paging down from the newest tweet ('new_low' and 'new_top' keep track
+        of how far it got), after which it continues with tweets older than
+        'bottom' until the search has no older results.
+
+        The requests continue from 'position', which runs ahead of the saved
+        'state' while the pages that were searched are still being handled.
+    '''
+
+    def __init__(self, state, save=None):
+        self.state = state
+        self.save = save if save else (lambda: None)
+
+        for key in ('top', 'bottom', 'new_top', 'new_low'):
+            self.state.setdefault(key, None)
+        self.state.setdefault('old_done', False)
+
+        self.position = dict(self.state)
+
+        # A fresh search starts by catching up, if there is anything to catch
+        # up on.
+        self.catching_up = self.state['top'] is not None
+
+    def next_params(self):
+        ''' Returns the max_id and since_id for the next search request, None
+            means there is nothing new left to look at for now.
+        '''
+        s = self.position
+
+        if self.catching_up:
+            return {
+                'since_id': s['top'],
+                'max_id': s['new_low'] - 1 if s['new_low'] else None,
+            }
+
+        if s['old_done']:
+            return None
+
+        return {
+            'since_id': None,
+            'max_id': s['bottom'] - 1 if s['bottom'] else None,
+        }
+
+    def advance(self, ids):
+        ''' Moves the cursor past a page with the given tweet ids. Returns
+            the position after the page, which is saved by 'commit'.
+        '''
+        s = self.position
+
+        if self.catching_up:
+            if ids:
+                s['new_top'] = max(ids + [s['new_top'] or 0])
+                s['new_low'] = min(ids)
+            else:
+                # Caught up, the new tweets connect to the covered range.
+                if s['new_top']:
+                    s['top'] = s['new_top']
+                s['new_top'] = None
+                s['new_low'] = None
+                self.catching_up = False
+        elif ids:
+            if s['top'] is None:
+                s['top'] = max(ids)
+            s['bottom'] = min(ids)
+        else:
+            s['old_done'] = True
+
+        return dict(s)
+
+    def commit(self, position):
+        ''' Saves a position returned by 'advance', once the conversations of
+            that page and of all pages before it were handed out
+        '''
+        self.state.update(position)
+        self.save()
+
+
+class SearchCursorStore:
+    ''' Saves the cursors of all searches to a single json file.
+
+        path:   path to the json file, None keeps the cursors in memory only
+    '''
+
+    def __init__(self, path=None):
+        self.path = path
+        self.states = {}
+        self.lock = threading.Lock()
+
+        if path and isfile(path):
+            try:
+                with open(path) as f:
+                    self.states = json.load(f)
+            except (OSError, ValueError):
+                # A broken state file only means starting from the top.
+                self.states = {}
+
+    @staticmethod
+    def key(query, language, geocode):
+        ''' Turns the search parameters into a key for the json file '''
+        return json.dumps([query, language, geocode])
+
+    def cursor(self, query, language, geocode):
+        ''' Returns the cursor for the given search parameters '''
+        state = self.states.setdefault(self.key(query, language, geocode), {})
+        return SearchCursor(state, self.save)
+
+    def save(self):
+        ''' Writes all cursors to disk, using a rename so a crash halfway
+            never leaves a broken file behind.
+        '''
+        if not self.path:
+            return
+
+        with self.lock:
+            tmp_path = f'{self.path}.tmp'
+
+            with open(tmp_path, 'w') as f:
+                json.dump(self.states, f)
+
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,193 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+File name:  sentiment_cache.py
+Authors:    Erwin Meijerhof (S2377012)
+            Wessel Poelman  (S2976129)
+Date:       16-10-2026
+GitHub:     https://github.com/WPoelman/hci-final-project
+Description:
+    Two-tier cache for the sentiment scores of tweet texts. The same texts
+    come back in a lot of files (overlapping chains, popular root tweets,
+    harvests of the same query), so most of them do not have to be scored
+    again. Scores are kept by a hash of the text and the version of the
+    lexicon and scorer, so a different lexicon or scorer never gets the
+    scores of the old one.
+    The first tier is an in-memory LRU, the second tier an SQLite database.
+Usage:
+    cache = SentimentCache('sentiment_cache.db', lexicon_version)
+    keys = [cache.key(text) for text in texts]
+    scores = cache.get_many(keys)
+    cache.put_many({key: score, ...})
+"""
+
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+class SentimentCache:
+    ''' Caches compound sentiment scores by text.
+
+        path:           path to the SQLite file, None only keeps scores in
+                        memory
+        lexicon:        version of the lexicon and scorer the scores come
+                        from
+        memory_size:    maximum number of scores kept in memory
+        disk_size:      maximum number of scores kept on disk
+    '''
+
+    def __init__(self, path=None, lexicon='', memory_size=100000,
+                 disk_size=5000000):
+        self.lexicon = lexicon.encode('utf-8')
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+
+        # Maps key -> score
+        self.memory = OrderedDict()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        # Scores are looked up by the loading job and stored from the
+        # threads of the scoring pool.
+        self.lock = threading.Lock()
+        self.connection = None
+        self.puts_since_eviction = 0
+
+        if path:
+            self.connection = sqlite3.connect(path, check_same_thread=False)
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS scores ('
+                'key BLOB PRIMARY KEY, '
+                'score REAL NOT NULL)'
+            )
+            self.connection.commit()
+
+    def key(self, text):
+        ''' Returns the key of a text. VADER splits the text on whitespace,
+            so texts that only differ in whitespace get the same score and
+            the same key.
+        '''
+        text = ' '.join(text.split()).encode('utf-8')
+
+        return hashlib.blake2b(self.lexicon + b'\0' + text,
+                               digest_size=16).digest()
+
+    def __remember(self, key, score):
+        ''' Puts a score in the in-memory LRU and evicts if it is full '''
+        self.memory[key] = score
+        self.memory.move_to_end(key)
+
+        while len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    def get_many(self, keys):
+        ''' Returns a dict with the cached scores for the given keys, missing
+            scores are left out.
+        '''
+        found = {}
+
+        with self.lock:
+            on_disk = []
+
+            for key in keys:
+                if key in found:
+                    continue
+
+                score = self.memory.get(key)
+
+                if score is not None:
+                    self.memory.move_to_end(key)
+                    found[key] = score
+                    self.memory_hits += 1
+                else:
+                    on_disk.append(key)
+
+            on_disk = list(dict.fromkeys(on_disk))
+            disk_found = 0
+
+            if on_disk and self.connection:
+                # SQLite has a limit on the number of parameters, so the keys
+                # are queried in chunks.
+                for start in range(0, len(on_disk), 500):
+                    chunk = on_disk[start:start + 500]
+                    rows = self.connection.execute(
+                        'SELECT key, score FROM scores '
+                        f'WHERE key IN ({",".join("?" * len(chunk))})',
+                        chunk
+                    ).fetchall()
+
+                    for key, score in rows:
+                        self.__remember(key, score)
+                        found[key] = score
+                        disk_found += 1
+
+            self.disk_hits += disk_found
+            self.misses += len(on_disk) - disk_found
+
+        return found
+
+    def put_many(self, scores):
+        ''' Stores the scores of a dict key -> score '''
+        with self.lock:
+            for key, score in scores.items():
+                self.__remember(key, score)
+
+            if not self.connection:
+                return
+
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO scores VALUES (?, ?)',
+                scores.items()
+            )
+
+            # Counting the table on every put gets slow for big caches.
+            self.puts_since_eviction += len(scores)
+            if self.puts_since_eviction > 10000:
+                self.__evict()
+
+            self.connection.commit()
+
+    def __evict(self):
+        ''' Removes the oldest scores once the disk cache is full. Should be
+            called while holding the lock.
+        '''
+        self.puts_since_eviction = 0
+
+        count = self.connection.execute(
+            'SELECT COUNT(*) FROM scores'
+        ).fetchone()[0]
+
+        if count > self.disk_size:
+            self.connection.execute(
+                'DELETE FROM scores WHERE rowid IN ('
+                'SELECT rowid FROM scores ORDER BY rowid LIMIT ?)',
+                (count - self.disk_size,)
+            )
+
+    def hit_rate(self):
+        ''' Returns the fraction of lookups that were answered by the cache '''
+        total = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / total if total else 0.0
+
+    def summary(self):
+        ''' Returns a short string with the hit rates '''
+        total = self.memory_hits + self.disk_hits + self.misses or 1
+
+        return (
+            f'{self.hit_rate():.0%} of the scores from the cache '
+            f'({self.memory_hits / total:.0%} memory, '
+            f'{self.disk_hits / total:.0%} disk)'
+        )
+
+    def close(self):
+        ''' Closes the connection to the database '''
+        with self.lock:
+            if self.connection:
+                self.connection.commit()
+                self.connection.close()
+                self.connection = None
@@ -0,0 +1,166 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+File name:  sentiment_pool.py
+Authors:    Erwin Meijerhof (S2377012)
+            Wessel Poelman  (S2976129)
+Date:       16-10-2026
+GitHub:     https://github.com/WPoelman/hci-final-project
+Description:
+    Scores tweet texts with VADER on a pool of processes, so opening a big
+    conversation file uses all cores instead of one. Every process loads the
+    lexicon into a BatchScorer once when it starts, the texts go to the
+    processes in big chunks so sending them over costs little compared to
+    scoring them. With a single process the texts are scored in this
+    process, without a pool.
+    With a SentimentCache only the texts that are not in the cache are
+    scored, and every text only once.
+Usage:
+    pool = SentimentPool(cache=SentimentCache(path, lexicon_version()))
+    scores = pool.submit(texts).result()
+    ...
+    pool.close()
+"""
+
+import hashlib
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from batch_sentiment import SCORER_VERSION, BatchScorer
+
+# Scorer of the worker process, loaded once by 'load_scorer'.
+scorer = None
+
+
+def load_scorer():
+    ''' Loads the lexicon, once per worker process '''
+    global scorer
+
+    if scorer is None:
+        scorer = BatchScorer()
+
+
+def lexicon_version():
+    ''' Returns a hash of the lexicon and the version of the scorer, which
+        changes when either of them changes
+    '''
+    load_scorer()
+
+    return hashlib.sha1(
+        f'{SCORER_VERSION}\n{scorer.analyzer.lexicon_file}'.encode('utf-8')
+    ).hexdigest()
+
+
+def score_texts(texts):
+    ''' Returns the compound sentiment score of every text '''
+    load_scorer()
+
+    return scorer.score(texts).tolist()
+
+
+class SentimentPool:
+    ''' Pool of processes that score tweet texts.
+
+        processes:  number of worker processes, the number of cores by
+                    default, 1 scores in this process
+        chunk_size: number of texts sent to a worker at a time
+        cache:      optional SentimentCache that is checked before scoring
+    '''
+
+    def __init__(self, processes=None, chunk_size=2000, cache=None):
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.cache = cache
+        self.executor = None
+
+        if self.processes > 1:
+            self.executor = ProcessPoolExecutor(max_workers=self.processes,
+                                                initializer=load_scorer)
+
+    def submit(self, texts):
+        ''' Starts scoring the texts, returns a future with the compound
+            score of every text
+        '''
+        texts = list(texts)
+
+        if not self.cache:
+            return self.__score(texts)
+
+        keys = [self.cache.key(text) for text in texts]
+        scores = self.cache.get_many(keys)
+
+        # The texts that are not in the cache, every one of them once.
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in scores:
+                missing.setdefault(key, text)
+
+        future = Future()
+        scoring = self.__score(list(missing.values()))
+
+        def scored(_):
+            try:
+                new_scores = dict(zip(missing, scoring.result()))
+                self.cache.put_many(new_scores)
+            except Exception as err:
+                future.set_exception(err)
+                return
+
+            scores.update(new_scores)
+            future.set_result([scores[key] for key in keys])
+
+        scoring.add_done_callback(scored)
+
+        return future
+
+    def __score(self, texts):
+        ''' Scores the texts on the pool, returns a future with the scores '''
+        if not self.executor:
+            future = Future()
+            future.set_result(score_texts(texts))
+            return future
+
+        chunks = [self.executor.submit(score_texts,
+                                       texts[i:i + self.chunk_size])
+                  for i in range(0, len(texts), self.chunk_size)]
+
+        # A single future for all chunks, filled in once the last is done.
+        future = Future()
+        remaining = [len(chunks)]
+        lock = threading.Lock()
+
+        def chunk_done(_):
+            with lock:
+                remaining[0] -= 1
+
+                if remaining[0] > 0:
+                    return
+
+            try:
+                future.set_result([score for chunk in chunks
+                                   for score in chunk.result()])
+            except Exception as err:
+                future.set_exception(err)
+
+        if not chunks:
+            future.set_result([])
+
+        for chunk in chunks:
+            chunk.add_done_callback(chunk_done)
+
+        return future
+
+    def score(self, texts):
+        ''' Returns the compound score of every text '''
+        return self.submit(texts).result()
+
+    def close(self):
+        ''' Stops the worker processes and closes the cache '''
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+        if self.cache:
+            self.cache.close()
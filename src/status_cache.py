@@ -0,0 +1,319 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+File name:  status_cache.py
+Authors:    Erwin Meijerhof (S2377012)
+            Wessel Poelman  (S2976129)
+Date:       16-10-2026
+GitHub:     https://github.com/WPoelman/hci-final-project
+Description:
+    Two-tier cache for tweets that were fetched earlier. The first tier is an
+    in-memory LRU, the second tier is an SQLite database on disk, so tweets
+    fetched in an earlier session do not have to be fetched again. Popular
+    root tweets show up in a lot of chains, so most lookups end up here
+    instead of going to the Twitter api. Candidates of which the chain was
+    rejected are remembered as well, so their chain is not walked again.
+Usage:
+    Used by the ChainResolver in chain_resolver.py and the api classes.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from tweet_record import TweetRecord
+
+
+class StatusCache:
+    ''' Caches TweetRecords by their id.
+
+        path:           path to the SQLite file, None only keeps tweets in
+                        memory
+        memory_size:    maximum number of tweets kept in memory
+        disk_size:      maximum number of tweets kept on disk
+        ttl:            number of seconds a tweet stays valid
+    '''
+
+    def __init__(self, path=None, memory_size=10000, disk_size=1000000,
+                 ttl=7 * 24 * 60 * 60):
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self.ttl = ttl
+
+        # Maps id -> (time the tweet was fetched, TweetRecord)
+        self.memory = OrderedDict()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        # The cache is created on the main thread, but used from the fetching
+        # thread(s), so all access goes through this lock.
+        self.lock = threading.Lock()
+        self.connection = None
+        self.puts_since_eviction = 0
+
+        if path:
+            self.connection = sqlite3.connect(path, check_same_thread=False)
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS statuses ('
+                'id INTEGER PRIMARY KEY, '
+                'record TEXT NOT NULL, '
+                'fetched_at REAL NOT NULL)'
+            )
+            self.connection.execute(
+                'CREATE INDEX IF NOT EXISTS statuses_fetched_at '
+                'ON statuses (fetched_at)'
+            )
+            self.connection.commit()
+
+    def __is_expired(self, fetched_at):
+        ''' Indicates if a tweet fetched at the given time is too old '''
+        return time.time() - fetched_at > self.ttl
+
+    def __remember(self, tweet_id, fetched_at, record):
+        ''' Puts a tweet in the in-memory LRU and evicts if it is full '''
+        self.memory[tweet_id] = (fetched_at, record)
+        self.memory.move_to_end(tweet_id)
+
+        while len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    def get_many(self, ids):
+        ''' Returns a dict with the cached tweets for the given ids, missing
+            or expired tweets are left out.
+        '''
+        found = {}
+
+        with self.lock:
+            on_disk = []
+            disk_found = 0
+
+            for tweet_id in ids:
+                entry = self.memory.get(tweet_id)
+
+                if entry and not self.__is_expired(entry[0]):
+                    self.memory.move_to_end(tweet_id)
+                    found[tweet_id] = entry[1]
+                    self.memory_hits += 1
+                else:
+                    self.memory.pop(tweet_id, None)
+                    on_disk.append(tweet_id)
+
+            if on_disk and self.connection:
+                # SQLite has a limit on the number of parameters, so the ids
+                # are queried in chunks.
+                for start in range(0, len(on_disk), 500):
+                    chunk = on_disk[start:start + 500]
+                    rows = self.connection.execute(
+                        'SELECT id, record, fetched_at FROM statuses '
+                        f'WHERE id IN ({",".join("?" * len(chunk))})',
+                        chunk
+                    ).fetchall()
+
+                    for tweet_id, record, fetched_at in rows:
+                        if self.__is_expired(fetched_at):
+                            continue
+
+                        record = TweetRecord.from_dict(json.loads(record),
+                                                       keep_user=True)
+                        self.__remember(tweet_id, fetched_at, record)
+                        found[tweet_id] = record
+                        disk_found += 1
+
+            self.disk_hits += disk_found
+            self.misses += len(on_disk) - disk_found
+
+        return found
+
+    def put_many(self, records):
+        ''' Stores the given TweetRecords '''
+        now = time.time()
+
+        with self.lock:
+            for record in records:
+                self.__remember(record.id, now, record)
+
+            if not self.connection:
+                return
+
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO statuses VALUES (?, ?, ?)',
+                [(r.id, json.dumps(r.to_dict()), now) for r in records]
+            )
+
+            # Evicting on every put would mean counting the table every
+            # time, which gets slow for big caches.
+            self.puts_since_eviction += len(records)
+            if self.puts_since_eviction > 1000:
+                self.__evict()
+
+            self.connection.commit()
+
+    def __evict(self):
+        ''' Removes expired tweets and the oldest tweets once the disk cache
+            is full. Should be called while holding the lock.
+        '''
+        self.puts_since_eviction = 0
+        self.connection.execute(
+            'DELETE FROM statuses WHERE fetched_at < ?',
+            (time.time() - self.ttl,)
+        )
+
+        count = self.connection.execute(
+            'SELECT COUNT(*) FROM statuses'
+        ).fetchone()[0]
+
+        if count > self.disk_size:
+            self.connection.execute(
+                'DELETE FROM statuses WHERE id IN ('
+                'SELECT id FROM statuses ORDER BY fetched_at LIMIT ?)',
+                (count - self.disk_size,)
+            )
+
+    def hit_rate(self):
+        ''' Returns the fraction of lookups that were answered by the cache '''
+        total = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / total if total else 0.0
+
+    def close(self):
+        ''' Closes the connection to the database '''
+        with self.lock:
+            if self.connection:
+                self.connection.commit()
+                self.connection.close()
+                self.connection = None
+
+
+class RejectionCache:
+    ''' Remembers candidate tweets of which the chain was rejected, so their
+        chain does not get walked again. For every candidate the reason and
+        the length of the chain are kept:
+            'broken':   a tweet in the chain could not be found, this can be
+                        a temporary failure, so it only holds for broken_ttl
+                        seconds
+            'length':   the chain has too few or too many turns
+            'seen':     all tweets of the chain were found before, this only
+                        holds for the current session
+
+        Rejections are written to disk in batches by 'flush', which the api
+        classes call once the candidates of a search page are done.
+
+        path:       path to the SQLite file, None only keeps the rejections
+                    for as long as the program runs
+        broken_ttl: number of seconds a 'broken' rejection stays valid
+    '''
+
+    def __init__(self, path=None, broken_ttl=24 * 60 * 60):
+        self.broken_ttl = broken_ttl
+
+        # Maps candidate id -> (reason, length, time of the rejection) for
+        # the candidates rejected while the program runs. Earlier rejections
+        # are looked up on disk.
+        self.rejections = {}
+        self.hits = 0
+
+        # Rejections that are not written to disk yet.
+        self.pending = []
+
+        self.lock = threading.Lock()
+        self.connection = None
+
+        if path:
+            self.connection = sqlite3.connect(path, check_same_thread=False)
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS rejections ('
+                'id INTEGER PRIMARY KEY, '
+                'reason TEXT NOT NULL, '
+                'length INTEGER NOT NULL, '
+                'rejected_at REAL NOT NULL)'
+            )
+            self.connection.execute(
+                'DELETE FROM rejections WHERE reason = ? AND rejected_at < ?',
+                ('broken', time.time() - self.broken_ttl)
+            )
+            self.connection.commit()
+
+    def __is_expired(self, reason, rejected_at):
+        ''' Indicates if a rejection is too old to be used '''
+        return (reason == 'broken' and
+                time.time() - rejected_at > self.broken_ttl)
+
+    def add(self, tweet_id, reason, length):
+        ''' Records a rejected candidate, 'seen' rejections are not saved to
+            disk, since the seen tweets start fresh every session.
+        '''
+        now = time.time()
+
+        with self.lock:
+            self.rejections[tweet_id] = (reason, length, now)
+
+            if self.connection and reason != 'seen':
+                self.pending.append((tweet_id, reason, length, now))
+
+    def flush(self):
+        ''' Writes the rejections added since the last flush to disk '''
+        with self.lock:
+            if not self.connection or not self.pending:
+                return
+
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO rejections VALUES (?, ?, ?, ?)',
+                self.pending
+            )
+            self.connection.commit()
+            self.pending = []
+
+    def is_rejected(self, tweet_id, min_conv_len, max_conv_len):
+        ''' Indicates if the chain of the candidate does not need to be walked
+            again. Length rejections are checked against the given window, so
+            changing the window does not keep out chains that fit now.
+        '''
+        with self.lock:
+            rejection = self.rejections.get(tweet_id)
+
+            if not rejection and self.connection:
+                rejection = self.connection.execute(
+                    'SELECT reason, length, rejected_at FROM rejections '
+                    'WHERE id = ?',
+                    (tweet_id,)
+                ).fetchone()
+
+            if not rejection:
+                return False
+
+            reason, length, rejected_at = rejection
+
+            if self.__is_expired(reason, rejected_at):
+                return False
+
+            rejected = (reason != 'length' or
+                        not min_conv_len <= length <= max_conv_len)
+
+            if rejected:
+                self.hits += 1
+
+            return rejected
+
+    def new_session(self):
+        ''' Forgets the 'seen' rejections, since the seen tweets were reset '''
+        with self.lock:
+            self.rejections = {
+                tweet_id: rejection
+                for tweet_id, rejection in self.rejections.items()
+                if rejection[0] != 'seen'
+            }
+
+    def close(self):
+        ''' Writes the remaining rejections and closes the connection to the
+            database
+        '''
+        self.flush()
+
+        with self.lock:
+            if self.connection:
+                self.connection.close()
+                self.connection = None
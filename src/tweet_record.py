@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+File name:  tweet_record.py
+Authors:    Erwin Meijerhof (S2377012)
+            Wessel Poelman  (S2976129)
+Date:       16-10-2026
+GitHub:     https://github.com/WPoelman/hci-final-project
+Description:
+    Compact record of a single tweet, with only the fields the program uses.
+    A raw tweet dict from the api contains the whole user object with its
+    profile, entities and colours, which makes up most of its size. The
+    record uses __slots__ and interns the screen names, since the same
+    authors come back a lot. It is used from fetching all the way to saving,
+    'to_dict' gives the format of the saved conversation files.
+Usage:
+    record = TweetRecord.from_dict(status._json)
+"""
+
+import sys
+
+
+class TweetRecord:
+    ''' Single tweet.
+
+        id:                 id of the tweet
+        parent_id:          id of the tweet this is a reply to, None if it
+                            is not a reply
+        created_at:         creation time as given by the api
+        text:               text of the tweet
+        author_id:          id of the author
+        screen_name:        screen name of the author
+        user:               optional full user object of the author
+        parent_author_id:   id of the author of the parent tweet
+        parent_screen_name: screen name of the author of the parent tweet
+    '''
+
+    __slots__ = ('id', 'parent_id', 'created_at', 'text', 'author_id',
+                 'screen_name', 'user', 'parent_author_id',
+                 'parent_screen_name')
+
+    def __init__(self, id, parent_id, created_at, text, author_id,
+                 screen_name, user=None, parent_author_id=None,
+                 parent_screen_name=None):
+        self.id = id
+        self.parent_id = parent_id
+        self.created_at = created_at
+        self.text = text
+        self.author_id = author_id
+        self.screen_name = sys.intern(screen_name) if screen_name else None
+        self.user = user
+        self.parent_author_id = parent_author_id
+        self.parent_screen_name = (sys.intern(parent_screen_name)
+                                   if parent_screen_name else None)
+
+    @classmethod
+    def from_dict(cls, tweet, keep_user=False):
+        ''' Creates a record from a raw tweet dict or a tweet from a saved
+            conversation file. The full user object is only kept if asked
+            for and if there is more to it than the id and screen name.
+        '''
+        user = tweet.get('user') or {}
+
+        return cls(
+            tweet['id'],
+            tweet.get('in_reply_to_status_id'),
+            tweet.get('created_at'),
+            tweet.get('text', ''),
+            user.get('id'),
+            user.get('screen_name'),
+            user if keep_user and len(user) > 2 else None,
+            tweet.get('in_reply_to_user_id'),
+            tweet.get('in_reply_to_screen_name')
+        )
+
+    def to_dict(self):
+        ''' Returns the tweet in the format of the saved conversation files '''
+        return {
+            'created_at': self.created_at,
+            'id': self.id,
+            'text': self.text,
+            'in_reply_to_status_id': self.parent_id,
+            'in_reply_to_user_id': self.parent_author_id,
+            'in_reply_to_screen_name': self.parent_screen_name,
+            'user': self.user or {
+                'id': self.author_id,
+                'screen_name': self.screen_name,
+            },
+        }
+
+    def __eq__(self, other):
+        return (isinstance(other, TweetRecord) and
+                all(getattr(self, key) == getattr(other, key)
+                    for key in self.__slots__))
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f'TweetRecord({self.id}, @{self.screen_name}: {self.text!r})'
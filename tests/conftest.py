@@ -0,0 +1,6 @@
+# The modules in src/ import each other by name, as they do when a script in
+# src/ is run, so the tests import them the same way.
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""
+File name:  test_batch_sentiment.py
+Authors:    Erwin Meijerhof (S2377012)
+            Wessel Poelman  (S2976129)
+Date:       16-10-2026
+GitHub:     https://github.com/WPoelman/hci-final-project
+Description:
+    Checks that the BatchScorer gives the same compound scores as the VADER
+    analyzer of nltk, for the tweets of the conversation file in data/ and
+    for random texts full of the words the VADER rules look at.
+Usage:
+    python -m pytest tests
+"""
+
+import os
+import random
+
+import pytest
+
+from batch_sentiment import BatchScorer, check_conformance
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), '..', 'data',
+                         '2021-04-09_22-25-53-English&covid-19.json')
+
+# Punctuation that gets stuck to the words of the random texts.
+PUNCTUATION = ('!', '?', '.', ',', '!!', '?!?', "'", '"', ':', '-', '...',
+               ')')
+
+
+@pytest.fixture(scope='module')
+def scorer():
+    return BatchScorer()
+
+
+def random_texts(scorer, count, seed):
+    ''' Returns random texts made of lexicon words, boosters, negations and
+        the other words with a rule of their own, in random case and with
+        random punctuation
+    '''
+    constants = scorer.analyzer.constants
+    words = ([w for w in scorer.lexicon if ' ' not in w] +
+             3 * (list(constants.BOOSTER_DICT) + list(constants.NEGATE) +
+                  ['never', 'so', 'this', 'but', 'at', 'least', 'kind',
+                   'of', 'the shit', 'kiss of death', ':)', ':(', '!!!',
+                   '?', '??', 'lol']) +
+             ['hello', 'world', 'covid', 'vaccine'])
+    rng = random.Random(seed)
+
+    def word():
+        w = rng.choice(words)
+        r = rng.random()
+        if r < 0.15:
+            w = w.upper()
+        elif r < 0.2:
+            w = w.capitalize()
+        if rng.random() < 0.2:
+            w += rng.choice(PUNCTUATION)
+        if rng.random() < 0.05:
+            w = rng.choice(('"', "'", '(', '#', '@', '-')) + w
+        return w
+
+    return [' '.join(word() for _ in range(rng.randint(0, 25)))
+            for _ in range(count)]
+
+
+def test_conversation_file():
+    assert check_conformance(DATA_FILE) == []
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_random_texts(scorer, seed):
+    texts = random_texts(scorer, 2000, seed)
+    scores = scorer.score(texts)
+    expected = [scorer.analyzer.polarity_scores(text)['compound']
+                for text in texts]
+
+    differences = [
+        (text, score, expected_score)
+        for text, score, expected_score in zip(texts, scores, expected)
+        if abs(score - expected_score) > 1e-4
+    ]
+
+    assert differences == []
+
+
+def test_empty_batch(scorer):
+    assert len(scorer.score([])) == 0